@@ -0,0 +1,103 @@
+"""Compare snapshot size and latency of note reads with every compression.
+
+Run from the repository root:
+
+    python -m benchmarks.compression_benchmark --notes 10000 --words 200 2000
+
+For every compression a notebook of large notes is compacted into a snapshot
+and loaded back. Then `show-note` is measured on notes read for the first
+time and on notes read again from the cache. `filter-notes` is measured on
+the first search, which builds the index from all contents, and on later
+searches. Results are printed as JSON.
+"""
+
+import json
+import os
+import tempfile
+from argparse import ArgumentParser
+from random import Random
+from statistics import median
+from time import perf_counter
+
+from neoassistant.assistant import Neoassistant, get_data_path
+from neoassistant.commands import ErrorResult, get_command, parse_input
+
+from .generators import generate_notes
+from .suite import working_directory
+
+
+DATA_FILENAME = "compression-benchmark.bin"
+
+
+def run_command(assistant: Neoassistant, line: str):
+    command_name, *args = parse_input(line)
+    result = get_command(command_name).execute(assistant, args)
+    if isinstance(result, ErrorResult):
+        raise RuntimeError(result)
+    if not isinstance(result, str):
+        # listings are rendered lazily
+        result = "".join(result)
+    return result
+
+
+def measure(func) -> float:
+    start = perf_counter()
+    func()
+    return (perf_counter() - start) * 1000
+
+
+def run_benchmark(compression: str | None, options) -> dict:
+    assistant = Neoassistant(compression)
+    for note in generate_notes(options.notes, options.seed, tuple(options.words)):
+        assistant.note_book.add_record(note)
+    titles = [note.title for note in assistant.note_book.values()]
+
+    compact_ms = measure(lambda: assistant.compact(DATA_FILENAME))
+    assistant.close()
+    size = os.path.getsize(get_data_path(DATA_FILENAME))
+
+    assistant = Neoassistant(compression)
+    load_ms = measure(lambda: assistant.load(DATA_FILENAME))
+
+    random = Random(options.seed)
+    sample = random.sample(titles, min(options.reads, len(titles)))
+    show_commands = [f"show-note -t '{title}'" for title in sample]
+    show_cold = [measure(lambda: run_command(assistant, c)) for c in show_commands]
+    show_warm = [measure(lambda: run_command(assistant, c)) for c in show_commands]
+
+    filter_command = "filter-notes -cr budget --limit 20"
+    filter_first_ms = measure(lambda: run_command(assistant, filter_command))
+    filter_next = [
+        measure(lambda: run_command(assistant, filter_command)) for _ in range(5)
+    ]
+    assistant.close()
+
+    return {
+        "snapshot_bytes": size,
+        "compact_ms": round(compact_ms, 3),
+        "load_ms": round(load_ms, 3),
+        "show_note_cold_ms": round(median(show_cold), 4),
+        "show_note_warm_ms": round(median(show_warm), 4),
+        "filter_notes_first_ms": round(filter_first_ms, 3),
+        "filter_notes_ms": round(median(filter_next), 3),
+    }
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--words", type=int, nargs=2, default=[200, 2000])
+    parser.add_argument("--reads", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+        for compression in (None, "zlib", "lzma"):
+            results[compression or "none"] = run_benchmark(compression, options)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Seeded generators of realistic contacts and notes for the benchmarks"""
+
+from datetime import date
+from itertools import accumulate
+from random import Random
+
+from neoassistant.contact_book import Contact
+from neoassistant.note_book import Note
+
+
+# fmt: off
+FIRST_NAMES = [
+    "Andrii", "Anna", "Bohdan", "Daria", "Dmytro", "Iryna", "Ivan", "Kateryna",
+    "Maksym", "Maria", "Mykola", "Nataliia", "Oksana", "Olena", "Oleksandr",
+    "Petro", "Serhii", "Sofiia", "Taras", "Yulia",
+]
+
+LAST_NAMES = [
+    "Bondarenko", "Boyko", "Hrytsenko", "Kovalenko", "Kovalchuk", "Kravchenko",
+    "Lysenko", "Marchenko", "Melnyk", "Moroz", "Oliinyk", "Pavlenko",
+    "Petrenko", "Rudenko", "Savchenko", "Shevchenko", "Tkachenko", "Tkachuk",
+]
+
+STREETS = [
+    "Khreshchatyk", "Sahaidachnoho", "Franka", "Shevchenka", "Lesi Ukrainky",
+    "Horodotska", "Deribasivska", "Sumska", "Naukova", "Peremohy",
+]
+
+CITIES = ["Kyiv", "Lviv", "Odesa", "Kharkiv", "Dnipro", "Vinnytsia", "Poltava"]
+
+DOMAINS = ["gmail.com", "ukr.net", "example.com", "i.ua", "outlook.com"]
+
+WORDS = [
+    "meeting", "project", "release", "budget", "review", "travel", "ticket",
+    "book", "recipe", "garden", "doctor", "invoice", "report", "birthday",
+    "gift", "school", "lesson", "workout", "plan", "idea", "call", "email",
+    "deadline", "design", "server", "backup", "family", "weekend", "concert",
+    "payment", "insurance", "car", "repair", "movie", "music", "shopping",
+]
+
+TAGS = [
+    "work", "home", "todo", "ideas", "family", "finance", "health", "travel",
+    "books", "shopping", "projects", "urgent", "later", "learning", "sport",
+    "music", "movies", "recipes", "car", "garden", "friends", "events",
+    "docs", "archive",
+]
+
+# fmt: on
+
+# Tags follow Zipf's law: the n-th most popular tag is n times rarer than the first
+TAG_WEIGHTS = list(accumulate(1 / rank for rank in range(1, len(TAGS) + 1)))
+
+FIRST_BIRTHDAY = date(1950, 1, 1).toordinal()
+LAST_BIRTHDAY = date(2010, 12, 31).toordinal()
+
+
+def generate_contact(random: Random, index: int) -> Contact:
+    """Generate a contact, the index makes its name unique"""
+    first_name = random.choice(FIRST_NAMES)
+    last_name = random.choice(LAST_NAMES)
+    contact = Contact(f"{first_name} {last_name} {index}")
+
+    for _ in range(random.choice((1, 1, 1, 2, 2, 3))):
+        contact.set_phone("0" + "".join(random.choices("0123456789", k=9)))
+
+    if random.random() < 0.8:
+        birthday = date.fromordinal(random.randint(FIRST_BIRTHDAY, LAST_BIRTHDAY))
+        contact.set_birthday(birthday.strftime("%d.%m.%Y"))
+
+    if random.random() < 0.7:
+        domain = random.choice(DOMAINS)
+        contact.set_email(f"{first_name}.{last_name}{index}@{domain}".lower())
+
+    if random.random() < 0.5:
+        street = random.choice(STREETS)
+        city = random.choice(CITIES)
+        contact.set_address(f"{random.randint(1, 150)} {street} street, {city}")
+
+    return contact
+
+
+def generate_note(random: Random, index: int, words: tuple = (5, 30)) -> Note:
+    """Generate a note, the index makes its title unique.
+
+    The content has the number of words in the given range.
+    """
+    title = f"{' '.join(random.choices(WORDS, k=2)).capitalize()} {index}"
+    content = " ".join(random.choices(WORDS, k=random.randint(*words)))
+    tags = {
+        *random.choices(TAGS, cum_weights=TAG_WEIGHTS, k=random.choice((0, 1, 2, 3)))
+    }
+    return Note(title, content, sorted(tags))
+
+
+def generate_contacts(count: int, seed: int = 42):
+    random = Random(seed)
+    return (generate_contact(random, i) for i in range(count))
+
+
+def generate_notes(count: int, seed: int = 42, words: tuple = (5, 30)):
+    random = Random(seed)
+    return (generate_note(random, i, words) for i in range(count))
@@ -0,0 +1,124 @@
+"""Measure memory used per contact and per note.
+
+Run from the repository root:
+
+    python -m benchmarks.memory_benchmark --records 100000
+    python -m benchmarks.memory_benchmark --records 100000 --baseline b0a4aaa
+
+With --baseline the same records are measured with the books of that git
+revision as well, e.g. the dict-based records before the slots, and both
+are printed side by side. Records in the books include their indexes.
+"""
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from random import Random
+from zipfile import ZipFile
+
+from neoassistant.contact_book import ContactBook
+from neoassistant.note_book import NoteBook
+
+from .generators import generate_contact, generate_note
+
+
+def measure(create_records, records: int) -> int:
+    """Return the number of bytes allocated per record"""
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    result = create_records(records)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return (end - start) // records
+
+
+def measure_revision(revision: str, records: int, seed: int) -> dict[str, int]:
+    """Run this benchmark with the books of the git revision in a subprocess"""
+    archive = subprocess.run(
+        ["git", "archive", "--format=zip", revision, "neoassistant"],
+        check=True,
+        capture_output=True,
+    ).stdout
+
+    with tempfile.TemporaryDirectory() as directory:
+        with ZipFile(io.BytesIO(archive)) as zip_file:
+            zip_file.extractall(directory)
+        # the benchmark itself is the current one, so the records are the same
+        shutil.copytree(
+            os.path.dirname(os.path.abspath(__file__)),
+            os.path.join(directory, "benchmarks"),
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.memory_benchmark"]
+            + ["--records", str(records), "--seed", str(seed), "--json"],
+            cwd=directory,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", help="Git revision to compare with")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    options = parser.parse_args()
+
+    def create_contacts(records):
+        random = Random(options.seed)
+        return [generate_contact(random, i) for i in range(records)]
+
+    def create_contact_book(records):
+        random = Random(options.seed)
+        book = ContactBook()
+        for i in range(records):
+            book.add(generate_contact(random, i))
+        return book
+
+    def create_notes(records):
+        random = Random(options.seed)
+        return [generate_note(random, i) for i in range(records)]
+
+    def create_note_book(records):
+        random = Random(options.seed)
+        book = NoteBook()
+        for i in range(records):
+            book.add_record(generate_note(random, i))
+        return book
+
+    results = {
+        "contact": measure(create_contacts, options.records),
+        "contact in a contact book": measure(create_contact_book, options.records),
+        "note": measure(create_notes, options.records),
+        "note in a notebook": measure(create_note_book, options.records),
+    }
+
+    if options.json:
+        print(json.dumps(results))
+        return
+
+    if options.baseline is None:
+        for name, size in results.items():
+            print(f"Bytes per {name}: {size}")
+        return
+
+    baseline = measure_revision(options.baseline, options.records, options.seed)
+    print(f"{'Bytes per':<30}{options.baseline:>12}{'current':>12}{'change':>10}")
+    for name, size in results.items():
+        change = f"{(size - baseline[name]) / baseline[name]:+.0%}"
+        print(f"{name:<30}{baseline[name]:>12}{size:>12}{change:>10}")
+
+
+if __name__ == "__main__":
+    main()
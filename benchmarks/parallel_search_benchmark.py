@@ -0,0 +1,93 @@
+"""Measure how the notes search scales with the number of worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_search_benchmark --notes 200000 --workers 1 2 4 8 16
+
+The notes are generated with the same seed, compacted into a snapshot and
+loaded back, so that their contents are read from the mapped file as in a
+real session. Every search narrows the notes down with the n-gram index,
+whose building is reported apart (as the first search), and the workers check
+the candidates; one worker means checking them in this process. Results are
+medians in milliseconds and speedups against one worker, written as JSON.
+Rare words leave few candidates, the workers pay off for frequent words and
+short substrings.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+from neoassistant.assistant import Neoassistant
+from neoassistant.content_scanner import content_scanner
+
+from .generators import generate_notes
+from .suite import measure, working_directory
+
+
+DATA_FILENAME = "benchmark-data.bin"
+
+# Frequent and rare words, a substring spanning words and a missing one
+CRITERIA = ("budget", "project review", "ing th", "no-such-text")
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=200_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8, os.cpu_count()]
+    )
+    parser.add_argument("--words", type=int, nargs=2, default=[50, 300])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+        print(f"Generating {options.notes} notes...", file=sys.stderr)
+        assistant = Neoassistant()
+        notes = generate_notes(options.notes, options.seed, tuple(options.words))
+        for note in notes:
+            assistant.note_book.add_record(note)
+        assistant.compact(DATA_FILENAME)
+        assistant.close()
+
+        assistant = Neoassistant()
+        assistant.load(DATA_FILENAME)
+        note_book = assistant.note_book
+        content_scanner.threshold = 0
+
+        for workers in sorted(set(options.workers)):
+            print(f"Searching with {workers} workers...", file=sys.stderr)
+            content_scanner.workers = workers
+
+            # the first search builds the index and the plan and starts the pool
+            start = perf_counter()
+            note_book.search(CRITERIA[0])
+            first_search = round((perf_counter() - start) * 1000, 4)
+
+            times = {
+                criteria: measure(lambda: note_book.search(criteria), options.repeat)
+                for criteria in CRITERIA
+            }
+            results[str(workers)] = {"first_search": first_search, **times}
+
+        content_scanner.close()
+        assistant.close()
+
+    serial = results.get("1")
+    if serial:
+        for workers, times in results.items():
+            times["speedup"] = {
+                criteria: round(serial[criteria] / times[criteria], 3)
+                for criteria in CRITERIA
+            }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
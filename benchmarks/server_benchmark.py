@@ -0,0 +1,149 @@
+"""Measure the throughput of the server under many simultaneous clients.
+
+Run from the repository root:
+
+    python -m benchmarks.server_benchmark --clients 1 10 100 --commands 200
+
+The server is started in a temporary directory with generated contacts and
+every client sends its commands one after another over the Unix socket.
+A share of the commands (--writes) changes contacts, the rest reads them.
+Results are commands per second and latency percentiles in milliseconds
+per number of clients, written as JSON.
+"""
+
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from statistics import quantiles
+from time import perf_counter
+
+from neoassistant.__main__ import NEOASSISTANT_DATA_FILENAME
+from neoassistant.assistant import Neoassistant
+
+from .generators import generate_contacts
+from .suite import working_directory
+
+
+SOCKET_FILENAME = "benchmark.sock"
+
+
+def get_commands(names: list[str], phones: list[str], count: int, writes: float, seed):
+    """Return a random mix of reading and writing command lines"""
+    generator = random.Random(seed)
+    commands = []
+    for index in range(count):
+        name = generator.choice(names)
+        if generator.random() < writes:
+            commands.append(f'change -cn "{name}" -a "{index} Benchmark street"')
+            continue
+        commands.append(
+            generator.choice(
+                [
+                    f'show -n "{name}"',
+                    f'filter -cr "{name.split()[1]}" --limit 10',
+                    f"find-by-phone -p {generator.choice(phones)}",
+                ]
+            )
+        )
+    return commands
+
+
+async def run_client(path: str, commands: list[str], latencies: list[float]):
+    reader, writer = await asyncio.open_unix_connection(path)
+    for command in commands:
+        start = perf_counter()
+        writer.write(command.encode("utf-8") + b"\n")
+        await writer.drain()
+        while line := await reader.readline():
+            message = json.loads(line)
+            if message.get("done"):
+                if not message["ok"]:
+                    raise RuntimeError(f"Command failed: {command}")
+                break
+        latencies.append((perf_counter() - start) * 1000)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_clients(path: str, client_commands: list[list[str]]) -> dict:
+    latencies = []
+    start = perf_counter()
+    await asyncio.gather(
+        *(run_client(path, commands, latencies) for commands in client_commands)
+    )
+    duration = perf_counter() - start
+
+    percentiles = quantiles(latencies, n=100)
+    return {
+        "commands_per_second": round(len(latencies) / duration, 1),
+        "latency_p50_ms": round(percentiles[49], 3),
+        "latency_p99_ms": round(percentiles[98], 3),
+    }
+
+
+async def wait_for_socket(path: str, server: subprocess.Popen):
+    while not os.path.exists(path):
+        if server.poll() is not None:
+            raise RuntimeError("The server exited before listening.")
+        await asyncio.sleep(0.05)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument(
+        "--commands", type=int, default=200, help="Commands sent by every client"
+    )
+    parser.add_argument("--contacts", type=int, default=10_000)
+    parser.add_argument(
+        "--writes", type=float, default=0.1, help="Share of the commands changing data"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args()
+
+    contacts = list(generate_contacts(options.contacts, options.seed))
+    names = [contact.name.value for contact in contacts]
+    phones = [contact.phones[0].value for contact in contacts if contact.phones]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        with working_directory(directory):
+            assistant = Neoassistant()
+            assistant.contact_book.add_many(contacts)
+            assistant.compact(NEOASSISTANT_DATA_FILENAME)
+            assistant.close()
+
+        path = os.path.join(directory, SOCKET_FILENAME)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "neoassistant", "--serve", f"unix:{path}"],
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(wait_for_socket(path, server))
+            for client_count in options.clients:
+                print(f"Running {client_count} clients...", file=sys.stderr)
+                client_commands = [
+                    get_commands(
+                        names, phones, options.commands, options.writes, seed=index
+                    )
+                    for index in range(client_count)
+                ]
+                results[str(client_count)] = asyncio.run(
+                    run_clients(path, client_commands)
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
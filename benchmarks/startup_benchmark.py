@@ -0,0 +1,93 @@
+"""Measure the cold start of the application.
+
+Run from the repository root:
+
+    python -m benchmarks.startup_benchmark --runs 10 --max-ms 150
+
+The import time of every module is reported by `python -X importtime`, the
+wall time is measured around a fresh interpreter running the script mode
+with an empty script. With --max-ms the exit code is non-zero when the
+median wall time exceeds the limit, so the benchmark can guard CI builds.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from statistics import median
+
+
+def measure_import_time() -> dict[str, int]:
+    """Return the cumulative import time in microseconds per module"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import neoassistant.__main__"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    import_times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+def measure_wall_time(data_directory: str) -> float:
+    """Return milliseconds taken by the application to start and exit"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "neoassistant", "--script", "-", "--output", "none"],
+        input="",
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=data_directory,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    options = parser.parse_args()
+
+    import_runs = [measure_import_time() for _ in range(options.runs)]
+    with tempfile.TemporaryDirectory() as data_directory:
+        wall_times = [measure_wall_time(data_directory) for _ in range(options.runs)]
+
+    import_times = {
+        module: median(run.get(module, 0) for run in import_runs)
+        for module in import_runs[0]
+    }
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)
+
+    result = {
+        "runs": options.runs,
+        "import_ms": import_times.get("neoassistant.__main__", 0) / 1000,
+        "wall_ms": round(median(wall_times), 3),
+        "slowest_imports_ms": {
+            module: microseconds / 1000
+            for module, microseconds in slowest[: options.top]
+        },
+    }
+    print(json.dumps(result, indent=2))
+
+    if options.max_ms is not None and result["wall_ms"] > options.max_ms:
+        print(
+            f"Startup took {result['wall_ms']:.1f} ms, more than {options.max_ms} ms",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
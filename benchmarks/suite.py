@@ -0,0 +1,194 @@
+"""Measure how the hot paths scale with the number of records.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --sizes 1000 100000 --output baseline.json
+    python -m benchmarks.suite --sizes 1000 100000 --compare baseline.json
+
+Every size generates that many contacts and notes with the same seed, so
+runs are reproducible. Results are medians in milliseconds written as JSON.
+In the compare mode every benchmark slower than the baseline by more than
+the threshold is reported and the exit code is non-zero.
+
+A million contacts and notes take about 12 GB of memory and several minutes
+to generate, so that size is only run when asked for with --sizes 1000000.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import islice
+from statistics import median
+from time import perf_counter
+
+from neoassistant.assistant import Neoassistant
+from neoassistant.commands import get_suggested_commands
+
+from .generators import generate_contacts, generate_notes
+
+
+DATA_FILENAME = "benchmark-data.bin"
+
+# Differences smaller than that are noise even if the relative change is big
+MIN_DIFFERENCE_MS = 0.5
+
+
+def measure(func, repeat: int) -> float:
+    """Return the median time of the function calls in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append((perf_counter() - start) * 1000)
+    return round(median(times), 4)
+
+
+@contextmanager
+def working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def get_benchmarks(assistant: Neoassistant) -> dict:
+    """Return the benchmarked calls by their names"""
+    contact_book = assistant.contact_book
+    note_book = assistant.note_book
+
+    contact = next(contact_book.values_by_name(len(contact_book) // 2))
+    note = next(note_book.values_by_title(len(note_book) // 2))
+    first_name, last_name, _ = contact.name.value.split()
+    misspelled_name = contact.name.value.replace(last_name, last_name[:-1])
+
+    def save():
+        contact.set_address("1 Benchmark street, Kyiv")
+        assistant.save(DATA_FILENAME)
+
+    def load():
+        Neoassistant().load(DATA_FILENAME)
+
+    today = date.today()
+    month = [today + timedelta(days=days) for days in range(30)]
+
+    return {
+        "filter_full_name": lambda: contact_book.filter(contact.name.value),
+        "filter_last_name": lambda: contact_book.filter(last_name),
+        "filter_short": lambda: contact_book.filter(first_name[:2]),
+        "find_by_phone": lambda: contact_book.find_by_phone(contact.phones[0].value),
+        "birthdays_7_days": lambda: contact_book.get_birthdays_per_week(7),
+        "birthdays_30_days": lambda: contact_book.get_birthdays_per_week(30),
+        "birthday_digests_7_days": lambda: contact_book.get_upcoming_birthdays(
+            month, 7
+        ),
+        "birthday_digests_30_days": lambda: contact_book.get_upcoming_birthdays(
+            month, 30
+        ),
+        "render_page": lambda: [str(c) for c in islice(contact_book.values(), 20)],
+        "similar_names": lambda: contact_book.get_similar_names(misspelled_name),
+        "search_notes_title": lambda: note_book.search(note.title),
+        "search_notes_word": lambda: note_book.search("budget"),
+        "search_by_tag": lambda: note_book.search_by_tags(["urgent"]),
+        "search_by_tags_all": lambda: note_book.search_by_tags(
+            ["work", "home"], match_all=True
+        ),
+        "suggested_commands": lambda: get_suggested_commands("fliter-notes"),
+        "save_change": save,
+        "compact": lambda: assistant.compact(DATA_FILENAME),
+        "load": load,
+    }
+
+
+# Persisting the books is too slow to repeat at large sizes
+SINGLE_RUN_BENCHMARKS = {"compact", "load"}
+
+
+def run_benchmarks(size: int, seed: int, repeat: int, pattern: str | None) -> dict:
+    results = {}
+    assistant = Neoassistant()
+
+    start = perf_counter()
+    assistant.contact_book.add_many(generate_contacts(size, seed))
+    for note in generate_notes(size, seed):
+        assistant.note_book.add_record(note)
+    results["build"] = round((perf_counter() - start) * 1000, 4)
+
+    with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+        for name, func in get_benchmarks(assistant).items():
+            if pattern and pattern not in name:
+                continue
+            runs = 1 if name in SINGLE_RUN_BENCHMARKS else repeat
+            results[name] = measure(func, runs)
+        assistant.close()
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return descriptions of the benchmarks slower than in the baseline"""
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, time in benchmarks.items():
+            baseline_time = baseline.get(size, {}).get(name)
+            if baseline_time is None or baseline_time == 0:
+                continue
+            ratio = time / baseline_time
+            if ratio > 1 + threshold and time - baseline_time > MIN_DIFFERENCE_MS:
+                regressions.append(
+                    f"{name} at {size} records: {baseline_time} ms -> {time} ms "
+                    f"({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "-k", dest="pattern", help="Only run benchmarks with the substring in the name"
+    )
+    parser.add_argument("--output", help="Write the results to the file")
+    parser.add_argument("--compare", help="Compare the results with the baseline file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Slowdown reported as a regression (0.2 means 20%%)",
+    )
+    options = parser.parse_args()
+
+    results = {}
+    for size in options.sizes:
+        print(f"Running benchmarks with {size} records...", file=sys.stderr)
+        results[str(size)] = run_benchmarks(
+            size, options.seed, options.repeat, options.pattern
+        )
+
+    output = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, options.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,183 @@
+import sys
+from argparse import ArgumentParser, FileType
+from pathlib import Path
+from time import perf_counter
+
 from .assistant import Neoassistant
+from .batch import run_script
 from .commands import get_command, get_suggested_commands, parse_input
+from .content_scanner import content_scanner
+from .instrumentation import instrumentation
 from .rich_formatter import RichFormatter
 
 
 NEOASSISTANT_DATA_FILENAME = "neoassistant-data.bin"
+NEOASSISTANT_DATABASE_FILENAME = "neoassistant-data.db"
+
+
+def parse_options():
+    parser = ArgumentParser(
+        prog="neoassistant",
+        description="A CLI application that helps to manage contacts and notes.",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["pickle", "sqlite"],
+        default="pickle",
+        help="Keep the books in memory (pickle) or in the SQLite database (sqlite)",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=["zlib", "lzma"],
+        default=None,
+        help="Compress the snapshot of the books and long note contents in it",
+    )
+    parser.add_argument(
+        "--script",
+        type=FileType("r", encoding="utf-8"),
+        help="Execute commands from the file ('-' for stdin) instead of prompting",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["rich", "plain", "none"],
+        default="rich",
+        help="How command results are printed in the script mode",
+    )
+    parser.add_argument(
+        "--continue-on-error",
+        action="store_true",
+        help="Do not stop the script on the first failed command",
+    )
+    parser.add_argument(
+        "--save-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Save the data every N commands of the script (by default only at the end)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="Serve commands of many clients on 'unix:PATH' or '[HOST:]PORT'",
+    )
+    parser.add_argument(
+        "--connect",
+        metavar="ADDRESS",
+        help="Execute commands on the server instead of loading the data",
+    )
+    parser.add_argument(
+        "--search-workers",
+        type=int,
+        default=content_scanner.workers,
+        metavar="N",
+        help="Processes checking many found notes in parallel (1 disables it)",
+    )
+    parser.add_argument(
+        "--parallel-threshold",
+        type=int,
+        default=content_scanner.threshold,
+        metavar="N",
+        help="Searches finding at least N candidate notes check them in parallel",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="DIRECTORY",
+        help="Write cProfile stats of every command into the directory",
+    )
+    return parser.parse_args()
 
 
 def main():
-    formatter = RichFormatter()
+    options = parse_options()
+    instrumentation.profile_directory = options.profile
+    content_scanner.workers = options.search_workers
+    content_scanner.threshold = options.parallel_threshold
+
+    if options.connect:
+        # the client neither loads nor saves the data, the server does
+        from .client import run_client
+
+        lines = options.script
+        failed_count = run_client(
+            options.connect,
+            lines,
+            output=options.output,
+            continue_on_error=options.continue_on_error,
+        )
+        if lines:
+            lines.close()
+        return 1 if failed_count > 0 else 0
+
+    if options.storage == "sqlite":
+        # sqlite3 is only imported when the database storage is chosen
+        from .sqlite_assistant import SqliteAssistant
+
+        neoassistant = SqliteAssistant()
+        data_filename = NEOASSISTANT_DATABASE_FILENAME
+    else:
+        neoassistant = Neoassistant(options.compression)
+        data_filename = NEOASSISTANT_DATA_FILENAME
+
+    with instrumentation.measure("load"):
+        neoassistant.load(data_filename)
 
-    neoassistant = Neoassistant()
-    neoassistant.load(NEOASSISTANT_DATA_FILENAME)
+    try:
+        if options.serve:
+            import asyncio
+
+            from .server import serve
+
+            try:
+                asyncio.run(serve(neoassistant, data_filename, options.serve))
+            except KeyboardInterrupt:
+                pass
+            neoassistant.save(data_filename)
+            return 0
+
+        if options.script:
+            with options.script as lines:
+                failed_count = run_script(
+                    neoassistant,
+                    data_filename,
+                    lines,
+                    output=options.output,
+                    continue_on_error=options.continue_on_error,
+                    save_every=options.save_every,
+                )
+            return 1 if failed_count > 0 else 0
+
+        run_interactive(neoassistant, data_filename)
+        return 0
+    finally:
+        neoassistant.close()
+
+
+def run_interactive(neoassistant, data_filename):
+    formatter = RichFormatter()
 
     formatter.print("Welcome to the neoassistant bot!", style="orange1")
     while True:
         try:
             user_input = formatter.input("[grey70]\nEnter the command\n>>> [/grey70] ")
+            start = perf_counter()
             command_name, *args = parse_input(user_input)
 
             command_object = get_command(command_name)
 
             if command_object:
-                result = command_object.execute(neoassistant, args)
-                formatter.print(f"\n{result}")
+                instrumentation.start_command(command_object.name)
+                instrumentation.record("parse", start)
+                with instrumentation.profile():
+                    result = command_object.execute(neoassistant, args)
+                    with instrumentation.measure("render"):
+                        formatter.print_result(result)
+
+                # only the records changed by the command are appended to the journal
+                with instrumentation.measure("save"):
+                    neoassistant.save(data_filename)
 
                 if command_object.is_final:
-                    neoassistant.save(NEOASSISTANT_DATA_FILENAME)
                     break
             else:
                 suggested_commands = get_suggested_commands(command_name)
@@ -37,7 +189,7 @@ def main():
 
         except KeyboardInterrupt:
             formatter.print("\n\nGood bye!")
-            neoassistant.save(NEOASSISTANT_DATA_FILENAME)
+            neoassistant.save(data_filename)
             break
 
         except:
@@ -45,4 +197,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
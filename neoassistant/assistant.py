@@ -1,9 +1,23 @@
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
-from pickle import dump, load
 
+from .content_scanner import content_scanner
+from .data_lock import DataLock
+from .journal import Journal, encode_record
 from .note_book import NoteBook
+from .render_cache import render_cache
 from .contact_book import ContactBook
+from .snapshot import ContentFile, StoredContent, read_snapshot, write_snapshot
+
+
+# The journal is compacted into a snapshot once it holds at least that many records
+# (or more records than both books together, whatever is bigger)
+COMPACTION_THRESHOLD = 10_000
+
+
+def get_data_path(filename) -> Path:
+    return Path.joinpath(Path.cwd(), ".neoassistant-data", filename)
 
 
 class Assistant(ABC):
@@ -27,11 +41,42 @@ class Assistant(ABC):
     def load(self, filename):
         pass
 
+    def close(self):
+        """Release resources held by the assistant"""
+
 
 class Neoassistant(Assistant):
-    def __init__(self):
+    """Assistant which keeps both books in memory.
+
+    The books are persisted as a pickled snapshot plus an append-only journal
+    of record-level changes, so saving costs are proportional to the changes.
+    Note contents are kept in the snapshot file apart from the pickle and read
+    from it on demand. Snapshots are optionally compressed with zlib or lzma.
+
+    Processes sharing the data directory save under an exclusive lock. When
+    the generation of the data changed since it was read, changes of others
+    are merged in first, and records changed by both keep the later version.
+    """
+
+    def __init__(self, compression: str = None):
         self.__contact_book = ContactBook()
         self.__note_book = NoteBook()
+        self.__journal: Journal = None
+        self.__content_file: ContentFile = None
+        self.__lock: DataLock = None
+        self.__generation = 0
+        self.__snapshot_generation = 0
+        # hashes of the records as they are stored in the journal by their keys
+        self.__hashes: dict[tuple[str, str], int] = {}
+        self.compression = compression
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_Neoassistant__journal"] = None
+        state["_Neoassistant__content_file"] = None
+        state["_Neoassistant__lock"] = None
+        state["_Neoassistant__hashes"] = {}
+        return state
 
     @property
     def contact_book(self) -> ContactBook:
@@ -42,16 +87,171 @@ class Neoassistant(Assistant):
         return self.__note_book
 
     def save(self, filename):
-        cache_folder_path = Path.joinpath(Path.cwd(), ".neoassistant-data")
-        cache_folder_path.mkdir(exist_ok=True)
-        file_path = Path.joinpath(cache_folder_path, filename)
-        with open(file_path, "wb") as file:
-            dump(self, file)
+        records = self.__pop_records()
+
+        lock = self.__get_lock(filename)
+        with lock.acquire(exclusive=True):
+            self.__merge(filename, records)
+
+            # records stored with the same contents (e.g. by others) are skipped
+            changed_records = []
+            for kind, key, record in records:
+                payload, checksum = encode_record((kind, key, record))
+                if self.__hashes.get((kind, key)) != checksum:
+                    self.__hashes[(kind, key)] = checksum
+                    changed_records.append((payload, checksum))
+
+            journal = self.__get_journal(filename)
+            if len(changed_records) > 0:
+                journal.append(changed_records)
+                self.__generation += 1
+                lock.write_generations(self.__generation, self.__snapshot_generation)
+
+            records_count = len(self.__contact_book) + len(self.__note_book)
+            if journal.record_count >= max(COMPACTION_THRESHOLD, records_count):
+                self.__compact(filename)
+
+    def compact(self, filename):
+        """Write a full snapshot and drop the journal records it includes"""
+        records = self.__pop_records()
+
+        with self.__get_lock(filename).acquire(exclusive=True):
+            self.__merge(filename, records)
+            self.__compact(filename)
 
     def load(self, filename):
-        path = Path.joinpath(Path.cwd(), ".neoassistant-data", filename)
+        lock = self.__get_lock(filename)
+        with lock.acquire(exclusive=False):
+            self.__generation, self.__snapshot_generation = lock.read_generations()
+            self.__read(filename)
+
+    def close(self):
+        if self.__journal:
+            self.__journal.close()
+        if self.__content_file:
+            self.__content_file.close()
+            self.__content_file = None
+            # and so do the workers of the parallel search
+            content_scanner.close()
+        if self.__lock:
+            self.__lock.close()
+
+    def __pop_records(self) -> list[tuple]:
+        """Return (kind, key, record or None if deleted) of the changed records"""
+        records = [
+            ("contact", name, self.__contact_book.find(name))
+            for name in self.__contact_book.pop_changes()
+        ]
+        records += [
+            ("note", title, self.__note_book.find_by_title(title))
+            for title in self.__note_book.pop_changes()
+        ]
+        return records
+
+    def __apply(self, kind: str, key: str, record):
+        if kind == "contact":
+            self.__contact_book.delete(key)
+            if record:
+                self.__contact_book.add(record)
+        elif kind == "note":
+            self.__note_book.delete(key)
+            if record:
+                self.__note_book.add_record(record)
+
+    def __read(self, filename):
+        """Read the books from the snapshot and the journal"""
+        path = get_data_path(filename)
         if path.exists():
-            with open(path, "rb") as file:
-                content = load(file)
-                self.__contact_book = content.contact_book
-                self.__note_book = content.note_book
+            content, self.__content_file = read_snapshot(path)
+            self.__contact_book = content.contact_book
+            self.__note_book = content.note_book
+            # records of the replaced books are only freed with their reference
+            # cycles, their strings are dropped right away
+            render_cache.clear()
+
+        self.__hashes = {}
+        for (kind, key, record), checksum in self.__get_journal(filename).replay():
+            self.__apply(kind, key, record)
+            self.__hashes[(kind, key)] = checksum
+
+        self.__contact_book.pop_changes()
+        self.__note_book.pop_changes()
+
+    def __merge(self, filename, records: list[tuple]):
+        """Catch up with the changes saved by other processes, keeping the records"""
+        generation, snapshot_generation = self.__lock.read_generations()
+        if generation == self.__generation:
+            return
+
+        if snapshot_generation != self.__snapshot_generation:
+            # the journal was compacted into a new snapshot, so it is read anew
+            if self.__journal:
+                self.__journal.close()
+            self.__journal = None
+            self.__read(filename)
+            for record in records:
+                self.__apply(*record)
+        else:
+            keys = {(kind, key) for kind, key, _ in records}
+            journal = self.__get_journal(filename)
+            for (kind, key, record), checksum in journal.replay(journal.size):
+                stored_checksum = self.__hashes.get((kind, key))
+                self.__hashes[(kind, key)] = checksum
+                # records changed here as well keep the version saved later
+                if (kind, key) not in keys and stored_checksum != checksum:
+                    self.__apply(kind, key, record)
+
+        self.__contact_book.pop_changes()
+        self.__note_book.pop_changes()
+        self.__generation = generation
+        self.__snapshot_generation = snapshot_generation
+
+    def __compact(self, filename):
+        file_path = get_data_path(filename)
+        file_path.parent.mkdir(exist_ok=True)
+
+        temp_path = file_path.with_name(f"{file_path.name}.tmp")
+        notes = list(self.__note_book.values())
+        if self.__content_file is not None:
+            # Windows cannot replace a mapped file, so the previous snapshot is
+            # closed first; its contents are read into memory only once, as
+            # writing the new snapshot would read them anyway
+            self.__note_book.reset_scan_plan()
+            for note in notes:
+                if note.stored_content is not None:
+                    note.content = note.content
+            self.__content_file.close()
+            self.__content_file = None
+            # and so do the workers of the parallel search
+            content_scanner.close()
+
+        offsets = write_snapshot(temp_path, self, notes, self.compression)
+        os.replace(temp_path, file_path)
+
+        self.__get_journal(filename).reset()
+        self.__hashes = {}
+        self.__generation += 1
+        self.__snapshot_generation = self.__generation
+        self.__lock.write_generations(self.__generation, self.__snapshot_generation)
+
+        # the contents are moved out of memory into the new snapshot
+        self.__content_file = ContentFile(file_path)
+        for note in notes:
+            note.content = StoredContent(self.__content_file, *offsets[id(note)])
+        self.__note_book.reset_scan_plan()
+
+    def __get_journal(self, filename) -> Journal:
+        path = get_data_path(f"{filename}.journal")
+        if self.__journal is None or self.__journal.path != path:
+            if self.__journal:
+                self.__journal.close()
+            self.__journal = Journal(path)
+        return self.__journal
+
+    def __get_lock(self, filename) -> DataLock:
+        path = get_data_path(f"{filename}.lock")
+        if self.__lock is None or self.__lock.path != path:
+            if self.__lock:
+                self.__lock.close()
+            self.__lock = DataLock(path)
+        return self.__lock
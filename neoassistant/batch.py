@@ -0,0 +1,102 @@
+import sys
+from time import perf_counter
+
+from .assistant import Assistant
+from .commands import ErrorResult, get_command, parse_input
+from .instrumentation import instrumentation
+from .rich_formatter import RichFormatter, escape_markup
+
+
+def run_script(
+    assistant: Assistant,
+    data_filename: str,
+    lines,
+    output: str = "rich",
+    continue_on_error: bool = False,
+    save_every: int = 0,
+) -> int:
+    """Execute commands line by line without prompts.
+
+    Empty lines and lines starting with '#' are skipped. The assistant is saved
+    every `save_every` commands (if it is positive) and once at the end, even if
+    a command raised an unexpected exception.
+    Returns the number of failed commands.
+    """
+    formatter = RichFormatter()
+    executed_count = 0
+    failed_count = 0
+
+    try:
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if len(line) == 0 or line.startswith("#"):
+                continue
+
+            command_object, result = execute_line(assistant, formatter, line, output)
+
+            executed_count += 1
+            if isinstance(result, ErrorResult):
+                failed_count += 1
+                print(
+                    f"Line {line_number}: {formatter.to_plain(result)}", file=sys.stderr
+                )
+
+            if save_every > 0 and executed_count % save_every == 0:
+                with instrumentation.measure("save"):
+                    assistant.save(data_filename)
+
+            if isinstance(result, ErrorResult) and not continue_on_error:
+                break
+
+            if command_object and command_object.is_final:
+                break
+    finally:
+        with instrumentation.measure("save"):
+            assistant.save(data_filename)
+        instrumentation.finish_command()
+
+    return failed_count
+
+
+def execute_line(assistant: Assistant, formatter: RichFormatter, line: str, output):
+    """Execute a command line and print its result.
+
+    Returns the command (None if it is not recognised) and its result. Any
+    exception raised by the command is turned into an error result.
+    """
+    start = perf_counter()
+    try:
+        command_name, *args = parse_input(line)
+    except ValueError as exc:
+        return None, ErrorResult(f"[red]{exc}[/red]")
+
+    command_object = get_command(command_name)
+    if not command_object:
+        return None, ErrorResult(f"[red]Unknown command '{command_name}'.[/red]")
+
+    instrumentation.start_command(command_object.name)
+    instrumentation.record("parse", start)
+    try:
+        with instrumentation.profile():
+            result = command_object.execute(assistant, args)
+            if not isinstance(result, ErrorResult):
+                with instrumentation.measure("render"):
+                    print_result(formatter, result, output)
+    except Exception as exc:
+        result = get_exception_result(exc)
+    return command_object, result
+
+
+def get_exception_result(exc: Exception) -> ErrorResult:
+    """Turn an unexpected exception into the error result of the command"""
+    message = escape_markup(f"{type(exc).__name__}: {exc}")
+    return ErrorResult(f"[red]{message}[/red]")
+
+
+def print_result(formatter: RichFormatter, result, output: str):
+    chunks = [result] if isinstance(result, str) else result
+    for chunk in chunks:
+        if output == "rich":
+            formatter.print(chunk)
+        elif output == "plain":
+            print(formatter.to_plain(chunk))
@@ -0,0 +1,104 @@
+from calendar import isleap
+from datetime import date, timedelta
+
+
+# Days of the year before every month in leap years
+LEAP_YEAR_OFFSETS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+# The numpy module once it is imported, False if it is not installed
+_numpy = None
+
+
+def get_numpy():
+    """Return the numpy module, or None if it is not installed.
+
+    NumPy is optional and only imported on the first use, it slows the startup down.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def get_year_days(month: int, day: int) -> tuple[int, int]:
+    """Return the zero-based day of the year of the birthday in leap and common years.
+
+    People born on the 29th of February celebrate on the 28th in common years.
+    """
+    leap_year_day = LEAP_YEAR_OFFSETS[month - 1] + day - 1
+    if month > 2 or (month, day) == (2, 29):
+        return leap_year_day, leap_year_day - 1
+    return leap_year_day, leap_year_day
+
+
+class BirthdayEngine:
+    """Days until the next birthdays of all contacts for many dates at once.
+
+    Birthdays are kept as NumPy arrays of their days of the year (in leap and
+    in common years) parallel to the names of the contacts, so every query is
+    a single vectorized pass over all of them.
+    """
+
+    def __init__(self, birthdays):
+        """Take (name, (month, day)) pairs of the contacts having birthdays"""
+        numpy = get_numpy()
+        self.names: list[str] = []
+        leap_year_days = []
+        common_year_days = []
+        for name, (month, day) in birthdays:
+            self.names.append(name)
+            leap_year_day, common_year_day = get_year_days(month, day)
+            leap_year_days.append(leap_year_day)
+            common_year_days.append(common_year_day)
+
+        self.name_array = numpy.array(self.names, dtype=object)
+        self.leap_year_days = numpy.array(leap_year_days, dtype=numpy.int16)
+        self.common_year_days = numpy.array(common_year_days, dtype=numpy.int16)
+
+    def get_days_until(self, reference_dates: list[date]):
+        """Return days until the next birthday by reference dates (rows) and contacts.
+
+        Birthdays falling on the reference date itself are 0 days away.
+        """
+        numpy = get_numpy()
+        years = [reference_date.year for reference_date in reference_dates]
+        is_leap = numpy.array([isleap(year) for year in years])[:, None]
+        is_next_leap = numpy.array([isleap(year + 1) for year in years])[:, None]
+        reference_days = numpy.array(
+            [day.timetuple().tm_yday - 1 for day in reference_dates], dtype=numpy.int16
+        )[:, None]
+        # int16 holds any number of days here and halves the memory traffic
+        year_lengths = numpy.where(is_leap, 366, 365).astype(numpy.int16)
+
+        days = numpy.where(is_leap, self.leap_year_days, self.common_year_days)
+        days -= reference_days
+        next_year = numpy.where(
+            is_next_leap, self.leap_year_days, self.common_year_days
+        )
+        next_year += year_lengths - reference_days
+        return numpy.where(days >= 0, days, next_year)
+
+    def get_upcoming(self, reference_dates: list[date], days_delta: int) -> list[dict]:
+        """Return names grouped by birthday dates within the days after every date"""
+        numpy = get_numpy()
+        upcoming = []
+        for reference_date, days in zip(
+            reference_dates, self.get_days_until(reference_dates)
+        ):
+            # today's birthdays are not upcoming even if the range wraps the year
+            selected = numpy.flatnonzero((days > 0) & (days <= days_delta))
+            # a stable sort keeps the names of a day in their order
+            selected = selected[numpy.argsort(days[selected], kind="stable")]
+            day_values, starts = numpy.unique(days[selected], return_index=True)
+
+            birthdays_list = {}
+            groups = numpy.split(selected, starts[1:])
+            for day_value, indexes in zip(day_values, groups):
+                birthday = reference_date + timedelta(days=int(day_value))
+                birthdays_list[birthday] = self.name_array[indexes].tolist()
+            upcoming.append(birthdays_list)
+        return upcoming
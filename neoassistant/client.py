@@ -0,0 +1,119 @@
+import json
+import socket
+import sys
+from contextlib import suppress
+
+from .batch import print_result
+from .rich_formatter import RichFormatter
+from .server import parse_address
+
+
+class AssistantClient:
+    """Blocking client sending command lines to the assistant server"""
+
+    def __init__(self, address: str):
+        family, arguments = parse_address(address)
+        if family == "unix":
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.connect(*arguments)
+        else:
+            self.__socket = socket.create_connection(arguments)
+        self.__file = self.__socket.makefile("rwb")
+
+    def execute(self, line: str):
+        """Send the command line and yield the response messages up to the final one"""
+        self.__file.write(line.encode("utf-8") + b"\n")
+        self.__file.flush()
+
+        while response := self.__file.readline():
+            if not response.endswith(b"\n"):
+                break
+            message = json.loads(response)
+            yield message
+            if message.get("done"):
+                return
+        raise ConnectionError("The server closed the connection.")
+
+    def close(self):
+        # flushing the unsent request fails again if the connection was lost
+        with suppress(OSError):
+            self.__file.close()
+        self.__socket.close()
+
+
+def run_client(
+    address: str, lines=None, output: str = "rich", continue_on_error: bool = False
+) -> int:
+    """Execute commands on the server, from the lines or prompting for them.
+
+    Returns the number of failed commands, a lost connection fails the command
+    being executed.
+    """
+    formatter = RichFormatter()
+    try:
+        client = AssistantClient(address)
+    except OSError as exc:
+        print(
+            f"Cannot connect to the server at {address}: {get_reason(exc)}",
+            file=sys.stderr,
+        )
+        return 1
+    failed_count = 0
+
+    if lines is None:
+        formatter.print("Welcome to the neoassistant bot!", style="orange1")
+
+    try:
+        for line_number, line in enumerate(prompt(formatter, lines), start=1):
+            line = line.strip()
+            if len(line) == 0 or line.startswith("#"):
+                continue
+
+            status = None
+            for message in client.execute(line):
+                if message.get("done"):
+                    # execute raises if the response ends without it
+                    status = message
+                elif "text" in message and output != "none":
+                    print(message["text"], end="")
+                elif "output" in message:
+                    print_result(formatter, message["output"], output)
+                elif "error" in message:
+                    if lines is None:
+                        formatter.print(message["error"])
+                    else:
+                        error = formatter.to_plain(message["error"])
+                        print(f"Line {line_number}: {error}", file=sys.stderr)
+
+            if not status["ok"]:
+                failed_count += 1
+                if lines is not None and not continue_on_error:
+                    break
+
+            if status["exit"]:
+                break
+    except KeyboardInterrupt:
+        formatter.print("\n\nGood bye!")
+    except OSError as exc:
+        print(
+            f"The connection to the server was lost: {get_reason(exc)}", file=sys.stderr
+        )
+        failed_count += 1
+    finally:
+        client.close()
+
+    return failed_count
+
+
+def get_reason(exc: OSError) -> str:
+    return exc.strerror or str(exc)
+
+
+def prompt(formatter: RichFormatter, lines):
+    """Yield the lines or the user input if there are no lines"""
+    if lines is not None:
+        yield from lines
+        return
+
+    while True:
+        yield formatter.input("[grey70]\nEnter the command\n>>> [/grey70] ")
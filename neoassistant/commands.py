@@ -1,39 +1,54 @@
 from abc import ABC, abstractmethod
 from argparse import ArgumentError
+from datetime import datetime, timedelta
+from itertools import islice
 from shlex import split
+from time import perf_counter
 
 from .argument_parser import AssistantArgumentParser
 
 from .note_book import Note
 from .assistant import Assistant
-from .contact_book import ContactBook, Contact
+from .contact_book import ContactBook, Contact, format_birthdays
 from .errors import InvalidCommandError, InvalidValueFieldError
+from .exporters import export_contacts, export_notes
+from .importers import import_contacts_from_file
+from .indexes import BKTree
+from .instrumentation import instrumentation
 from .rich_formatter import RichFormatter
 
 
-def levenshtein_distance(s1, s2):
-    m, n = len(s1), len(s2)
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
+def parse_input(user_input):
+    """Parse input string and return command name and arguments"""
+    cmd, *args = split(user_input)
+    cmd = cmd.strip().lower()
+    return cmd, *args
 
-    for i in range(m + 1):
-        dp[i][0] = i
 
-    for j in range(n + 1):
-        dp[0][j] = j
+# Number of records shown on a page when only '--page' is specified
+PAGE_SIZE = 20
 
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            cost = 0 if s1[i - 1] == s2[j - 1] else 1
-            dp[i][j] = min(dp[i - 1][j] + 1, dp[i][j - 1] + 1, dp[i - 1][j - 1] + cost)
 
-    return dp[m][n]
+class ErrorResult(str):
+    """Result of a command which failed because of the invalid input"""
 
 
-def parse_input(user_input):
-    """Parse input string and return command name and arguments"""
-    cmd, *args = split(user_input)
-    cmd = cmd.strip().lower()
-    return cmd, *args
+def render_records(records, limit: int | None = None, empty_message: str = ""):
+    """Render records lazily, so that the first ones are printed right away"""
+    is_empty = True
+    for record in islice(records, limit):
+        is_empty = False
+        yield str(record)
+
+    if is_empty:
+        yield empty_message
+
+
+def format_not_found(message: str, suggestions: list[str]) -> ErrorResult:
+    message = f"[red]{message}[/red]"
+    if len(suggestions) == 0:
+        return ErrorResult(message)
+    return ErrorResult(f"{message} Did you mean: {', '.join(suggestions)}?")
 
 
 def input_error(func):
@@ -44,9 +59,9 @@ def input_error(func):
             return func(self, address_book, args)
 
         except InvalidCommandError as e:
-            return f"[red]{e.message}[/red]"
+            return ErrorResult(f"[red]{e.message}[/red]")
         except InvalidValueFieldError as e:
-            return f"[red]{e.message}[/red]"
+            return ErrorResult(f"[red]{e.message}[/red]")
 
     return inner
 
@@ -56,8 +71,14 @@ def parse_arguments(func):
 
     def inner(self, address_book: ContactBook, args):
         try:
+            start = perf_counter()
             args = vars(self.parser.parse_args(args))
-            return func(self, address_book, args)
+            instrumentation.record("parse", start)
+
+            start = perf_counter()
+            result = func(self, address_book, args)
+            instrumentation.record("execute", start)
+            return result
         except ArgumentError as exc:
             raise InvalidCommandError(self.name, exc.message) from exc
 
@@ -68,13 +89,31 @@ class Command(ABC):
     """Abstract class for commands"""
 
     def __init__(
-        self, name: str, description: str, alias: str = None, is_final: bool = False
+        self,
+        name: str,
+        description: str,
+        alias: str = None,
+        is_final: bool = False,
+        changes_data: bool = False,
     ):
         self.name = name
         self.description = description
         self.alias = alias
         self.is_final = is_final
-        self.parser = AssistantArgumentParser(name, description)
+        # the server saves the books after the commands changing them
+        self.changes_data = changes_data
+        self.__parser = None
+
+    @property
+    def parser(self) -> AssistantArgumentParser:
+        """Argument parser built on the first use, so that startup stays cheap"""
+        if self.__parser is None:
+            self.__parser = AssistantArgumentParser(self.name, self.description)
+            self.add_arguments(self.__parser)
+        return self.__parser
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        """Add command arguments to the parser"""
 
     def __str__(self):
         return self.parser.get_help_message()
@@ -82,6 +121,33 @@ class Command(ABC):
     def get_short_description(self):
         return self.parser.get_short_description()
 
+    def add_paging_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("--limit", type=int, required=False, default=None)
+        parser.add_argument("--offset", type=int, required=False, default=0)
+        parser.add_argument("--page", type=int, required=False, default=None)
+
+    def get_paging(self, args: dict) -> tuple[int, int | None]:
+        """Return the offset and the limit (None for no limit) of shown records"""
+        limit = args.get("limit")
+        offset = args.get("offset")
+        page = args.get("page")
+
+        if limit is not None and limit < 1:
+            raise InvalidCommandError(self.name, "The minimum value for 'limit' is 1.")
+
+        if offset < 0:
+            raise InvalidCommandError(self.name, "The minimum value for 'offset' is 0.")
+
+        if page is not None:
+            if page < 1:
+                raise InvalidCommandError(
+                    self.name, "The minimum value for 'page' is 1."
+                )
+            limit = limit or PAGE_SIZE
+            offset += (page - 1) * limit
+
+        return offset, limit
+
     @abstractmethod
     def execute(self, assistant: Assistant, args: dict):
         pass
@@ -92,9 +158,12 @@ class AddContactCommand(Command):
         super().__init__(
             "add",
             "Add a new contact.",
+            changes_data=True,
         )
-        self.parser.add_argument("-n", "--name", type=str, required=True)
-        self.parser.add_argument(
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-n", "--name", type=str, required=True)
+        parser.add_argument(
             "-p",
             "--phones",
             action="extend",
@@ -103,15 +172,9 @@ class AddContactCommand(Command):
             required=False,
             default=[],
         )
-        self.parser.add_argument(
-            "-b", "--birthday", type=str, required=False, default=None
-        )
-        self.parser.add_argument(
-            "-a", "--address", type=str, required=False, default=None
-        )
-        self.parser.add_argument(
-            "-e", "--email", type=str, required=False, default=None
-        )
+        parser.add_argument("-b", "--birthday", type=str, required=False, default=None)
+        parser.add_argument("-a", "--address", type=str, required=False, default=None)
+        parser.add_argument("-e", "--email", type=str, required=False, default=None)
 
     @input_error
     @parse_arguments
@@ -124,7 +187,7 @@ class AddContactCommand(Command):
 
         contact = assistant.contact_book.find(name)
         if contact:
-            return f"Contact with name '{name}' already exists."
+            return ErrorResult(f"[red]Contact with name '{name}' already exists.[/red]")
 
         contact = Contact(name)
 
@@ -151,11 +214,13 @@ class ChangeContactCommand(Command):
         super().__init__(
             "change",
             "Change a contact.",
+            changes_data=True,
         )
-        self.parser = AssistantArgumentParser("change", "Change a contact.")
-        self.parser.add_argument("-cn", "--current-name", type=str, required=True)
-        self.parser.add_argument("-n", "--name", type=str, required=False)
-        self.parser.add_argument(
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-cn", "--current-name", type=str, required=True)
+        parser.add_argument("-n", "--name", type=str, required=False)
+        parser.add_argument(
             "-p",
             "--phones",
             action="extend",
@@ -164,15 +229,9 @@ class ChangeContactCommand(Command):
             required=False,
             default=[],
         )
-        self.parser.add_argument(
-            "-b", "--birthday", type=str, required=False, default=None
-        )
-        self.parser.add_argument(
-            "-a", "--address", type=str, required=False, default=None
-        )
-        self.parser.add_argument(
-            "-e", "--email", type=str, required=False, default=None
-        )
+        parser.add_argument("-b", "--birthday", type=str, required=False, default=None)
+        parser.add_argument("-a", "--address", type=str, required=False, default=None)
+        parser.add_argument("-e", "--email", type=str, required=False, default=None)
 
     @input_error
     @parse_arguments
@@ -187,10 +246,13 @@ class ChangeContactCommand(Command):
         contact = assistant.contact_book.find(current_name)
 
         if not contact:
-            return f"Contact with name '{current_name}' is not found."
+            return format_not_found(
+                f"Contact with name '{current_name}' is not found.",
+                assistant.contact_book.get_similar_names(current_name),
+            )
 
         if len(phones) > 0:
-            contact.phones.clear()
+            contact.clear_phones()
             for phone in phones:
                 contact.set_phone(phone)
 
@@ -216,9 +278,11 @@ class DeleteContactCommand(Command):
         super().__init__(
             "delete",
             "Delete a contact.",
+            changes_data=True,
         )
 
-        self.parser.add_argument("-n", "--name", type=str, required=True)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-n", "--name", type=str, required=True)
 
     @input_error
     @parse_arguments
@@ -228,12 +292,87 @@ class DeleteContactCommand(Command):
         contact = assistant.contact_book.find(name)
 
         if not contact:
-            return f"Contact with name '{name}' is not found."
+            return format_not_found(
+                f"Contact with name '{name}' is not found.",
+                assistant.contact_book.get_similar_names(name),
+            )
 
         assistant.contact_book.delete(name)
         return "Contact deleted."
 
 
+class ImportContactsCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "import",
+            "Import contacts from the CSV file (with name, phones, birthday, email "
+            "and address columns) or from the vCard file.",
+            changes_data=True,
+        )
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-f", "--file", type=str, required=True)
+        parser.add_argument(
+            "--format", choices=["csv", "vcard"], required=False, default=None
+        )
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        path = args.get("file")
+
+        try:
+            result = import_contacts_from_file(
+                assistant.contact_book, path, args.get("format")
+            )
+        except OSError as exc:
+            raise InvalidCommandError(
+                self.name, f"Cannot read the file '{path}': {exc.strerror}."
+            ) from exc
+
+        if result.stop_message is not None:
+            raise InvalidCommandError(self.name, str(result))
+        return str(result)
+
+
+class ExportContactsCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "export",
+            "Export contacts (all or satisfying the search criteria) "
+            "to the CSV or JSONL file.",
+        )
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-f", "--file", type=str, required=True)
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"], required=False, default=None
+        )
+        parser.add_argument("-cr", "--criteria", type=str, required=False, default=None)
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        path = args.get("file")
+        criteria = args.get("criteria")
+
+        if criteria is not None and len(criteria) < 2:
+            raise InvalidCommandError(
+                self.name, "The minimum length of 'criteria' is 2 characters."
+            )
+
+        try:
+            count = export_contacts(
+                assistant.contact_book, path, args.get("format"), criteria
+            )
+        except OSError as exc:
+            raise InvalidCommandError(
+                self.name, f"Cannot write the file '{path}': {exc.strerror}."
+            ) from exc
+
+        return f"Exported {count} contacts."
+
+
 class ShowContactCommand(Command):
     def __init__(self):
         super().__init__(
@@ -241,7 +380,8 @@ class ShowContactCommand(Command):
             "Show contact information.",
         )
 
-        self.parser.add_argument("-n", "--name", type=str, required=True)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-n", "--name", type=str, required=True)
 
     @input_error
     @parse_arguments
@@ -251,17 +391,78 @@ class ShowContactCommand(Command):
         contact = assistant.contact_book.find(name)
 
         if not contact:
-            return f"Contact with name '{name}' is not found."
+            return format_not_found(
+                f"Contact with name '{name}' is not found.",
+                assistant.contact_book.get_similar_names(name),
+            )
 
         return str(contact)
 
 
+class FindContactsByPhoneCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "find-by-phone",
+            "Find contacts having the phone.",
+        )
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-p", "--phone", type=str, required=True)
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        phone = args.get("phone")
+
+        contacts = assistant.contact_book.find_by_phone(phone)
+        if len(contacts) == 0:
+            return ErrorResult(f"[red]Contact with phone '{phone}' is not found.[/red]")
+
+        return "\n".join(str(contact) for contact in contacts)
+
+
+class FindContactsByEmailCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "find-by-email",
+            "Find contacts having the email.",
+        )
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-e", "--email", type=str, required=True)
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        email = args.get("email")
+
+        contacts = assistant.contact_book.find_by_email(email)
+        if len(contacts) == 0:
+            return ErrorResult(f"[red]Contact with email '{email}' is not found.[/red]")
+
+        return "\n".join(str(contact) for contact in contacts)
+
+
 class ShowAllContactsCommand(Command):
     def __init__(self):
         super().__init__("all", "Show all contacts.")
 
-    def execute(self, assistant: Assistant, _):
-        return str(assistant.contact_book)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        self.add_paging_arguments(parser)
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        if len(assistant.contact_book) == 0:
+            return "Contact book is empty."
+
+        offset, limit = self.get_paging(args)
+
+        return render_records(
+            assistant.contact_book.values_by_name(offset),
+            limit,
+            "No contacts on this page.",
+        )
 
 
 class ShowBirthdaysCommand(Command):
@@ -271,7 +472,8 @@ class ShowBirthdaysCommand(Command):
             "Show all birthdays per the next specified number of days.",
         )
 
-        self.parser.add_argument("-d", "--days", type=int, required=False, default=7)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-d", "--days", type=int, required=False, default=7)
 
     @input_error
     @parse_arguments
@@ -287,6 +489,49 @@ class ShowBirthdaysCommand(Command):
         return assistant.contact_book.get_birthdays_per_week(days_delta)
 
 
+class ShowBirthdayDigestsCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "birthday-digests",
+            "Show birthdays per the specified number of days after each of the "
+            "next dates, e.g. to prepare reminders for a month.",
+        )
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-d", "--days", type=int, required=False, default=7)
+        parser.add_argument("-n", "--dates", type=int, required=False, default=30)
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        days_delta = args.get("days")
+        dates_count = args.get("dates")
+
+        if days_delta < 2:
+            raise InvalidCommandError(self.name, "The minimum value for 'days' is 2.")
+
+        if days_delta > 365:
+            raise InvalidCommandError(self.name, "The maximum value for 'days' is 365.")
+
+        if dates_count < 1 or dates_count > 366:
+            raise InvalidCommandError(
+                self.name, "The value for 'dates' must be from 1 to 366."
+            )
+
+        current_date = datetime.now().date()
+        reference_dates = [
+            current_date + timedelta(days=days) for days in range(dates_count)
+        ]
+        digests = assistant.contact_book.get_upcoming_birthdays(
+            reference_dates, days_delta
+        )
+        return (
+            f"Digest for {reference_date.strftime('%d.%m.%Y')}. "
+            + format_birthdays(birthdays_list, days_delta)
+            for reference_date, birthdays_list in zip(reference_dates, digests)
+        )
+
+
 class FilterContactsCommand(Command):
     def __init__(self):
         super().__init__(
@@ -294,7 +539,9 @@ class FilterContactsCommand(Command):
             "Filter contacts by search criteria.",
         )
 
-        self.parser.add_argument("-cr", "--criteria", type=str, required=True)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-cr", "--criteria", type=str, required=True)
+        self.add_paging_arguments(parser)
 
     @input_error
     @parse_arguments
@@ -306,11 +553,13 @@ class FilterContactsCommand(Command):
                 self.name, "The minimum length of 'criteria' is 2 characters."
             )
 
+        offset, limit = self.get_paging(args)
+
         contacts = assistant.contact_book.filter(criteria)
         if len(contacts) == 0:
             return f"Contacts that satisfy search criteria '{criteria}' are not found."
 
-        return "\n".join(str(contact) for contact in contacts)
+        return render_records(contacts[offset:], limit, "No contacts on this page.")
 
 
 class AddNoteCommand(Command):
@@ -318,13 +567,13 @@ class AddNoteCommand(Command):
         super().__init__(
             "add-note",
             "Add a new note.",
+            changes_data=True,
         )
 
-        self.parser.add_argument("-t", "--title", type=str, required=True)
-        self.parser.add_argument(
-            "-c", "--content", type=str, required=False, default=""
-        )
-        self.parser.add_argument(
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-t", "--title", type=str, required=True)
+        parser.add_argument("-c", "--content", type=str, required=False, default="")
+        parser.add_argument(
             "--tags", action="extend", nargs="+", type=str, required=False, default=[]
         )
 
@@ -337,7 +586,7 @@ class AddNoteCommand(Command):
 
         note = assistant.note_book.find_by_title(title)
         if note:
-            return f"Note with title '{title}' already exists."
+            return ErrorResult(f"[red]Note with title '{title}' already exists.[/red]")
 
         note = Note(title, content, tags)
         assistant.note_book.add_record(note)
@@ -350,16 +599,14 @@ class ChangeNoteCommand(Command):
         super().__init__(
             "change-note",
             "Change a note.",
+            changes_data=True,
         )
 
-        self.parser.add_argument("-ct", "--current-title", type=str, required=True)
-        self.parser.add_argument(
-            "-t", "--title", type=str, required=False, default=None
-        )
-        self.parser.add_argument(
-            "-c", "--content", type=str, required=False, default=None
-        )
-        self.parser.add_argument(
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-ct", "--current-title", type=str, required=True)
+        parser.add_argument("-t", "--title", type=str, required=False, default=None)
+        parser.add_argument("-c", "--content", type=str, required=False, default=None)
+        parser.add_argument(
             "--tags", action="extend", nargs="+", type=str, required=False, default=None
         )
 
@@ -373,7 +620,10 @@ class ChangeNoteCommand(Command):
 
         note = assistant.note_book.find_by_title(current_title)
         if not note:
-            return f"Note with title '{current_title}' is not found."
+            return format_not_found(
+                f"Note with title '{current_title}' is not found.",
+                assistant.note_book.get_similar_titles(current_title),
+            )
 
         assistant.note_book.change(current_title, title, content, tags)
 
@@ -385,9 +635,11 @@ class DeleteNoteCommand(Command):
         super().__init__(
             "delete-note",
             "Delete a note.",
+            changes_data=True,
         )
 
-        self.parser.add_argument("-t", "--title", type=str, required=True)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-t", "--title", type=str, required=True)
 
     @input_error
     @parse_arguments
@@ -397,7 +649,10 @@ class DeleteNoteCommand(Command):
         note = assistant.note_book.find_by_title(title)
 
         if not note:
-            return f"Note with title '{title}' is not found."
+            return format_not_found(
+                f"Note with title '{title}' is not found.",
+                assistant.note_book.get_similar_titles(title),
+            )
 
         assistant.note_book.delete(title)
 
@@ -411,9 +666,8 @@ class ShowNoteCommand(Command):
             "Show a note.",
         )
 
-        self.parser.add_argument(
-            "-t", "--title", type=str, required=True, help="Note title"
-        )
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-t", "--title", type=str, required=True, help="Note title")
 
     @input_error
     @parse_arguments
@@ -422,7 +676,10 @@ class ShowNoteCommand(Command):
 
         note = assistant.note_book.find_by_title(title)
         if not note:
-            return f"Note with title '{title}' is not found."
+            return format_not_found(
+                f"Note with title '{title}' is not found.",
+                assistant.note_book.get_similar_titles(title),
+            )
 
         return str(note)
 
@@ -434,8 +691,22 @@ class ShowAllNotesCommand(Command):
             "Show all notes.",
         )
 
-    def execute(self, assistant: Assistant, _):
-        return str(assistant.note_book)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        self.add_paging_arguments(parser)
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        if len(assistant.note_book) == 0:
+            return "Notebook is empty."
+
+        offset, limit = self.get_paging(args)
+
+        return render_records(
+            assistant.note_book.values_by_title(offset),
+            limit,
+            "No notes on this page.",
+        )
 
 
 class FilterNotesCommand(Command):
@@ -445,7 +716,9 @@ class FilterNotesCommand(Command):
             "Filter notes by criteria.",
         )
 
-        self.parser.add_argument("-cr", "--criteria", type=str, required=True)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-cr", "--criteria", type=str, required=True)
+        self.add_paging_arguments(parser)
 
     @input_error
     @parse_arguments
@@ -457,11 +730,13 @@ class FilterNotesCommand(Command):
                 self.name, "The minimum length of 'criteria' is 2 characters."
             )
 
+        offset, limit = self.get_paging(args)
+
         notes = assistant.note_book.search(criteria)
         if len(notes) == 0:
             return f"Notes with criteria '{criteria}' are not found."
 
-        return "\n".join(str(note) for note in notes)
+        return render_records(notes[offset:], limit, "No notes on this page.")
 
 
 class FilterNotesByTagsCommand(Command):
@@ -471,27 +746,115 @@ class FilterNotesByTagsCommand(Command):
             "Filter notes by tags.",
         )
 
-        self.parser.add_argument(
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument(
             "--tags", action="extend", nargs="+", type=str, required=True
         )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Show only notes having all the tags",
+        )
+        self.add_paging_arguments(parser)
 
     @input_error
     @parse_arguments
     def execute(self, assistant: Assistant, args: dict):
         tags = args.get("tags")
+        match_all = args.get("all")
+
+        offset, limit = self.get_paging(args)
 
-        notes = assistant.note_book.search_by_tags(tags)
+        notes = assistant.note_book.search_by_tags(tags, match_all)
         if len(notes) == 0:
             return f"Notes with tags '{', '.join(tags)}' are not found."
 
-        return "\n".join(str(note) for note in notes)
+        return render_records(notes[offset:], limit, "No notes on this page.")
+
+
+class ShowTagsCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "tags",
+            "Show all tags with the number of notes having them.",
+        )
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        tag_counts = assistant.note_book.get_tag_counts()
+        if len(tag_counts) == 0:
+            return "No tags found."
+
+        formatter = RichFormatter()
+        return "\n".join(
+            formatter.format_field_value_pair(tag, tag_counts[tag])
+            for tag in sorted(tag_counts)
+        )
+
+
+class ExportNotesCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "export-notes",
+            "Export notes (all or having the tags) to the CSV or JSONL file.",
+        )
+
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-f", "--file", type=str, required=True)
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"], required=False, default=None
+        )
+        parser.add_argument(
+            "--tags", action="extend", nargs="+", type=str, required=False, default=[]
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Export only notes having all the tags",
+        )
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        path = args.get("file")
+
+        try:
+            count = export_notes(
+                assistant.note_book,
+                path,
+                args.get("format"),
+                args.get("tags"),
+                args.get("all"),
+            )
+        except OSError as exc:
+            raise InvalidCommandError(
+                self.name, f"Cannot write the file '{path}': {exc.strerror}."
+            ) from exc
+
+        return f"Exported {count} notes."
+
+
+class ShowStatsCommand(Command):
+    def __init__(self):
+        super().__init__(
+            "stats",
+            "Show how long parsing, execution, rendering and saving took per command.",
+        )
+
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
+        return instrumentation.format_stats()
 
 
 class ExitCommand(Command):
     def __init__(self):
         super().__init__("exit", "Exit the program.", alias="close", is_final=True)
 
-    def execute(self, *_):
+    @input_error
+    @parse_arguments
+    def execute(self, assistant: Assistant, args: dict):
         return "Good bye!"
 
 
@@ -502,7 +865,8 @@ class HelpCommand(Command):
             "Show all available commands or a single command info.",
         )
 
-        self.parser.add_argument("-c", "--command", type=str, required=False)
+    def add_arguments(self, parser: AssistantArgumentParser):
+        parser.add_argument("-c", "--command", type=str, required=False)
 
     @input_error
     @parse_arguments
@@ -529,9 +893,14 @@ COMMANDS: list[Command] = [
     AddContactCommand(),
     ChangeContactCommand(),
     DeleteContactCommand(),
+    ImportContactsCommand(),
+    ExportContactsCommand(),
     ShowContactCommand(),
+    FindContactsByPhoneCommand(),
+    FindContactsByEmailCommand(),
     ShowAllContactsCommand(),
     ShowBirthdaysCommand(),
+    ShowBirthdayDigestsCommand(),
     FilterContactsCommand(),
     AddNoteCommand(),
     ChangeNoteCommand(),
@@ -540,27 +909,53 @@ COMMANDS: list[Command] = [
     ShowAllNotesCommand(),
     FilterNotesCommand(),
     FilterNotesByTagsCommand(),
+    ShowTagsCommand(),
+    ExportNotesCommand(),
+    ShowStatsCommand(),
     ExitCommand(),
     HelpCommand(),
 ]
 
-COMMANDS_MAP = {(c.name, c.alias): c for c in COMMANDS}
+# Typos within that distance of a command name or alias are suggested
+SUGGESTION_DISTANCE = 3
+
+COMMANDS_MAP: dict[str, Command] = {}
+
+# Command names and aliases by every prefix of them
+PREFIXES_MAP: dict[str, set[str]] = {}
 
-VALID_COMMANDS = [c.name for c in COMMANDS]
+SUGGESTION_INDEX = BKTree()
+
+
+def register_command(command: Command):
+    """Make the command available by its name and alias"""
+    for key in (command.name, command.alias):
+        if key is None:
+            continue
+        COMMANDS_MAP[key] = command
+        SUGGESTION_INDEX.add(key)
+        for i in range(1, len(key) + 1):
+            PREFIXES_MAP.setdefault(key[:i], set()).add(key)
+
+
+for command in COMMANDS:
+    register_command(command)
 
 
 def get_command(command_name: str):
-    command = None
-    for keys, handler in COMMANDS_MAP.items():
-        if command_name in keys:
-            command = handler
-            break
-    return command
+    return COMMANDS_MAP.get(command_name)
 
 
 def get_suggested_commands(command_name: str):
-    suggested_commands = []
-    for valid_command in VALID_COMMANDS:
-        if levenshtein_distance(command_name, valid_command) <= 3:
-            suggested_commands.append(valid_command)
+    """Return commands close to the misspelled name or uniquely starting with it"""
+    suggested_commands = [
+        key for _, key in SUGGESTION_INDEX.search(command_name, SUGGESTION_DISTANCE)
+    ]
+
+    completions = PREFIXES_MAP.get(command_name, set())
+    if len(completions) == 1:
+        completion = next(iter(completions))
+        if completion not in suggested_commands:
+            suggested_commands.insert(0, completion)
+
     return suggested_commands
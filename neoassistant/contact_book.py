@@ -1,24 +1,88 @@
-from collections import UserDict, defaultdict
-from datetime import datetime
+from calendar import isleap
+from collections import UserDict
+from datetime import date, datetime, timedelta
 
+from .birthday_engine import BirthdayEngine, get_numpy
+from .indexes import DeletionIndex, NGramIndex, PostingIndex, SortedKeys
+from .render_cache import render_cache
 from .rich_formatter import RichFormatter
 from .fields import Name, Phone, Birthday, Email, Address
 
 
 formatter = RichFormatter()
 
+# Smaller books and narrower ranges of days are computed faster with the birthday
+# index than with the engine, only a few days of birthdays are looked up there
+ENGINE_MIN_CONTACTS = 50_000
+ENGINE_MIN_DAYS = 60
+
+
+def get_upcoming_days(current_date: date, days_delta: int) -> dict[tuple, date]:
+    """Map (month, day) of birthdays to their dates within the next days.
+
+    People born on the 29th of February celebrate on the 28th in common years.
+    Today's birthdays are not upcoming even if the range wraps the whole year.
+    """
+    upcoming_days = {}
+    for delta_days in range(1, days_delta + 1):
+        day = current_date + timedelta(days=delta_days)
+        upcoming_days.setdefault((day.month, day.day), day)
+        if (day.month, day.day) == (2, 28) and not isleap(day.year):
+            upcoming_days.setdefault((2, 29), day)
+
+    upcoming_days.pop((current_date.month, current_date.day), None)
+    if (current_date.month, current_date.day) == (2, 28) and not isleap(
+        current_date.year
+    ):
+        upcoming_days.pop((2, 29), None)
+
+    return upcoming_days
+
+
+def format_birthdays(birthdays_list: dict, days_delta: int) -> str:
+    """Format names of contacts grouped by the upcoming birthday date"""
+    if len(birthdays_list) == 0:
+        return f"No birthdays near {days_delta} days."
+
+    sorted_birthdays_list = sorted(birthdays_list.keys())
+
+    result = f"Birthdays for the next {days_delta} days:\n"
+    for day in sorted_birthdays_list:
+        result += f"{day.strftime('%d.%m.%Y')} - {', '.join(birthdays_list[day])}\n"
+
+    return result
+
 
 class Contact:
     """Class for contact"""
 
+    # weak references are taken by the render cache
+    __slots__ = (
+        "book",
+        "name",
+        "birthday",
+        "phones",
+        "address",
+        "email",
+        "__weakref__",
+    )
+
     def __init__(self, name: str):
+        self.book: ContactBook = None
         self.name = Name(name)
         self.birthday: Birthday = None
-        self.phones: list[Phone] = []
+        self.phones: tuple[Phone, ...] = ()
         self.address: Address = None
         self.email: Email = None
 
     def __str__(self):
+        result = render_cache.get(self)
+        if result is None:
+            result = self.__render()
+            render_cache.put(self, result)
+        return result
+
+    def __render(self) -> str:
         result = f"{formatter.format_field_value_pair('Name', self.name.value)}\n"
 
         if len(self.phones) > 0:
@@ -39,88 +103,279 @@ class Contact:
 
         return result
 
+    def get_search_values(self) -> list[str]:
+        """Return field values matched by the contacts filter"""
+        values = [self.name.value]
+        values.extend(p.value for p in self.phones)
+
+        if self.birthday:
+            values.append(str(self.birthday))
+
+        if self.address:
+            values.append(self.address.value)
+
+        if self.email:
+            values.append(self.email.value)
+
+        return values
+
+    def get_birthday_month_day(self) -> list[tuple]:
+        """Return the (month, day) of the birthday used by the birthday calendar"""
+        if not self.birthday:
+            return []
+        return [(self.birthday.value.month, self.birthday.value.day)]
+
+    def get_normalized_email(self) -> list[str]:
+        """Return the email used by the reverse lookup"""
+        if not self.email:
+            return []
+        return [Email.normalize(self.email.value)]
+
+    def matches(self, search_criteria: str) -> bool:
+        return any(search_criteria in value for value in self.get_search_values())
+
+    def __getstate__(self):
+        # the owning book restores the back reference when the contact is added
+        return (self.name, self.birthday, self.phones, self.address, self.email)
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # contacts pickled before slots kept an instance dictionary
+            state = (
+                state["name"],
+                state.get("birthday"),
+                state.get("phones", ()),
+                state.get("address"),
+                state.get("email"),
+            )
+
+        self.book = None
+        self.name, self.birthday, phones, self.address, self.email = state
+        self.phones = tuple(phones)
+
+    def __before_update(self):
+        """Notify the owning book that the contact fields are about to change"""
+        render_cache.invalidate(self)
+        if self.book is not None:
+            self.book.before_update(self)
+
+    def __after_update(self):
+        if self.book is not None:
+            self.book.after_update(self)
+
     def set_phone(self, phone: str):
-        self.phones.append(Phone(phone))
+        phone = Phone(phone)
+        self.__before_update()
+        self.phones = (*self.phones, phone)
+        self.__after_update()
+
+    def clear_phones(self):
+        self.__before_update()
+        self.phones = ()
+        self.__after_update()
 
     def set_birthday(self, birthday: str):
-        self.birthday = Birthday(birthday)
+        birthday = Birthday(birthday)
+        self.__before_update()
+        self.birthday = birthday
+        self.__after_update()
 
     def set_email(self, email: str):
-        self.email = Email(email)
+        email = Email(email)
+        self.__before_update()
+        self.email = email
+        self.__after_update()
 
     def set_address(self, address: str):
-        self.address = Address(address)
+        address = Address(address)
+        self.__before_update()
+        self.address = address
+        self.__after_update()
 
 
 class ContactBook(UserDict):
     """Class for contact book"""
 
+    def __init__(self):
+        super().__init__()
+        self.__changes = set()
+        self.__create_indexes()
+
+    def __getstate__(self):
+        return {"data": self.data}
+
+    def __setstate__(self, state):
+        self.data = state["data"]
+        self.__changes = set()
+        self.__create_indexes()
+        for contact in self.data.values():
+            contact.book = self
+            self.__index(contact)
+
     def __str__(self) -> str:
         if len(self.data) == 0:
             return "Contact book is empty."
 
-        return "\n".join(
-            str(record) for record in self.sort_by_name(self.data.values())
-        )
+        return "\n".join(str(record) for record in self.values_by_name())
+
+    def values_by_name(self, offset: int = 0):
+        """Iterate over contacts in the order of their names"""
+        return (self.data[name] for name in self.__names.iterate(offset))
 
     def add(self, contact: Contact):
+        self.delete(contact.name.value)
+        contact.book = self
         self.data[contact.name.value] = contact
+        self.__names.add(contact.name.value)
+        self.__similar_names.add(contact.name.value)
+        self.__index(contact)
+        self.__changes.add(contact.name.value)
+
+    def add_many(self, contacts):
+        """Add contacts with new names, indexing them after all are inserted"""
+        contacts = list(contacts)
+        for contact in contacts:
+            contact.book = self
+            self.data[contact.name.value] = contact
+            self.__changes.add(contact.name.value)
+
+        if len(contacts) > len(self.__names):
+            # a single sort is cheaper than many insertions
+            self.__names = SortedKeys(self.data)
+        else:
+            for contact in contacts:
+                self.__names.add(contact.name.value)
+
+        for contact in contacts:
+            self.__similar_names.add(contact.name.value)
+            self.__index(contact)
 
     def find(self, name: str) -> Contact:
         return self.data[name] if name in self.data else None
 
+    def find_by_phone(self, phone: str) -> list[Contact]:
+        names = self.__phone_index.get(Phone(phone).value)
+        return [self.data[name] for name in self.__names.get_ordered(names)]
+
+    def find_by_email(self, email: str) -> list[Contact]:
+        names = self.__email_index.get(Email(Email.normalize(email)).value)
+        return [self.data[name] for name in self.__names.get_ordered(names)]
+
+    def get_similar_names(
+        self, name: str, max_distance: int = 2, limit: int = 5
+    ) -> list[str]:
+        """Return the closest names within the edit distance of the misspelled one"""
+        similar = self.__similar_names.search(name, max_distance)
+        return [name for _, name in similar][:limit]
+
     def delete(self, name: str):
         if name in self.data:
-            self.data.pop(name)
+            contact = self.data.pop(name)
+            contact.book = None
+            # the contact may be renamed and added back
+            render_cache.invalidate(contact)
+            self.__names.remove(name)
+            self.__similar_names.remove(name)
+            self.__unindex(contact)
+            self.__changes.add(name)
+
+    def before_update(self, contact: Contact):
+        self.__unindex(contact)
+
+    def after_update(self, contact: Contact):
+        self.__index(contact)
+        self.__changes.add(contact.name.value)
+
+    def __create_indexes(self):
+        self.__names = SortedKeys(self.data)
+        self.__similar_names = DeletionIndex(self.data)
+        self.__search_index: NGramIndex = None
+        self.__birthday_index = PostingIndex()
+        self.__birthday_engine: BirthdayEngine = None
+        self.__phone_index = PostingIndex()
+        self.__email_index = PostingIndex()
+
+    def __index(self, contact: Contact):
+        name = contact.name.value
+        self.__birthday_engine = None
+        if self.__search_index is not None:
+            self.__search_index.add(name, contact.get_search_values())
+        self.__birthday_index.add(name, contact.get_birthday_month_day())
+        self.__phone_index.add(name, (p.value for p in contact.phones))
+        self.__email_index.add(name, contact.get_normalized_email())
+
+    def __unindex(self, contact: Contact):
+        name = contact.name.value
+        self.__birthday_engine = None
+        if self.__search_index is not None:
+            self.__search_index.remove(name, contact.get_search_values())
+        self.__birthday_index.remove(name, contact.get_birthday_month_day())
+        self.__phone_index.remove(name, (p.value for p in contact.phones))
+        self.__email_index.remove(name, contact.get_normalized_email())
+
+    def pop_changes(self) -> set[str]:
+        """Return names of contacts changed since the previous call"""
+        changes, self.__changes = self.__changes, set()
+        return changes
 
     def get_birthdays_per_week(self, days_delta=7):
-        user_records = self.data.values()
-
-        if len(user_records) == 0:
+        if len(self.data) == 0:
             return "No users found."
 
-        birthdays_list = defaultdict(list)
         current_date = datetime.now().date()
+        return format_birthdays(
+            self.__get_birthdays(current_date, days_delta), days_delta
+        )
 
-        for record in user_records:
-            name = record.name.value
-
-            if not record.birthday:
-                continue
-
-            birthday = record.birthday.value
-
-            birthday_this_year = birthday.replace(year=current_date.year)
-
-            if birthday_this_year < current_date:
-                birthday_this_year = birthday_this_year.replace(
-                    year=current_date.year + 1
-                )
-
-            delta_days = (birthday_this_year - current_date).days
-            if delta_days > 0 and delta_days <= days_delta:
-                birthdays_list[birthday_this_year].append(name)
-
-        if len(birthdays_list) == 0:
-            return f"No birthdays near {days_delta} days."
-
-        sorted_birthdays_list = sorted(birthdays_list.keys())
+    def get_upcoming_birthdays(
+        self, reference_dates: list[date], days_delta: int
+    ) -> list[dict[date, list[str]]]:
+        """Return names grouped by birthday dates within the days after every date.
+
+        Wide ranges of days in large books are computed for all the dates in one
+        pass with NumPy if it is installed.
+        """
+        if (
+            len(self.data) < ENGINE_MIN_CONTACTS
+            or days_delta < ENGINE_MIN_DAYS
+            or get_numpy() is None
+        ):
+            return [
+                self.__get_birthdays(reference_date, days_delta)
+                for reference_date in reference_dates
+            ]
+
+        if self.__birthday_engine is None:
+            # built on the first query, so that loading stays cheap
+            self.__birthday_engine = BirthdayEngine(
+                (contact.name.value, month_day)
+                for contact in self.values_by_name()
+                for month_day in contact.get_birthday_month_day()
+            )
+        return self.__birthday_engine.get_upcoming(reference_dates, days_delta)
 
-        result = f"Birthdays for the next {days_delta} days:\n"
-        for day in sorted_birthdays_list:
-            result += f"{day.strftime('%d.%m.%Y')} - {', '.join(birthdays_list[day])}\n"
+    def __get_birthdays(self, current_date: date, days_delta: int) -> dict:
+        birthdays_list = {}
+        for month_day, day in get_upcoming_days(current_date, days_delta).items():
+            names = self.__birthday_index.get(month_day)
+            if len(names) > 0:
+                birthdays_list.setdefault(day, []).extend(names)
 
-        return result
+        # the 28th of February of common years has birthdays of two days
+        for names in birthdays_list.values():
+            names.sort()
+        return birthdays_list
 
     def filter(self, search_criteria: str) -> list[Contact]:
-        return self.sort_by_name(
-            list(
-                filter(
-                    lambda contact: str(contact).find(search_criteria) > 0,
-                    self.data.values(),
-                )
-            )
-        )
-
-    def sort_by_name(self, contacts: list[Contact]) -> list[Contact]:
-        return sorted(contacts, key=lambda contact: contact.name.value)
+        if self.__search_index is None:
+            # built on the first filter, most sessions never filter and loading
+            # every contact into it would cost most of the startup and memory
+            self.__search_index = NGramIndex()
+            for name, contact in self.data.items():
+                self.__search_index.add(name, contact.get_search_values())
+
+        candidates = self.__search_index.get_candidates(search_criteria)
+        names = {
+            name for name in candidates if self.data[name].matches(search_criteria)
+        }
+        return [self.data[name] for name in self.__names.get_ordered(names)]
@@ -0,0 +1,201 @@
+import atexit
+import mmap
+import os
+import weakref
+from array import array
+
+
+# Fewer candidate notes found by the n-gram index are checked in this process
+PARALLEL_THRESHOLD = 20_000
+
+# Every worker gets several shards, so that workers done early take the remaining
+SHARDS_PER_WORKER = 4
+
+# Share of the notes changed since the plan was built which makes it rebuilt
+STALE_PLAN_SHARE = 0.1
+
+
+class ScanPlan:
+    """Locations of the stored note contents, shared with the worker processes.
+
+    Workers scan the contents right in the snapshot file they map, and read the
+    locations from the shared memory, so nothing but the positions of the notes
+    are pickled per search. Notes with contents kept in memory are matched in
+    this process.
+    """
+
+    def __init__(self, notes):
+        from multiprocessing.shared_memory import SharedMemory
+
+        from .snapshot import COMPRESSIONS
+
+        self.titles: list[str] = []
+        self.contents = []
+        # positions of the stored contents by the titles of their notes
+        self.positions: dict[str, int] = {}
+        self.notes_in_memory = {}
+        self.content_file = None
+        self.memory: SharedMemory = None
+
+        # offset, length and compression id of every stored content
+        entries = array("q")
+        for note in notes:
+            content = note.stored_content
+            if content is not None and self.content_file is None:
+                self.content_file = content.file
+            if content is None or content.file is not self.content_file:
+                self.notes_in_memory[note.title] = note
+                continue
+
+            self.positions[note.title] = len(self.titles)
+            self.titles.append(note.title)
+            self.contents.append(content)
+            compression_id = COMPRESSIONS.index(content.compression)
+            entries.extend((content.offset, content.length, compression_id))
+
+        if len(entries) > 0:
+            data = entries.tobytes()
+            self.memory = SharedMemory(create=True, size=len(data))
+            self.memory.buf[: len(data)] = data
+            self.__finalizer = weakref.finalize(self, release_memory, self.memory)
+
+    def close(self):
+        if self.memory is not None:
+            self.__finalizer()
+            self.memory = None
+
+
+def release_memory(memory):
+    memory.close()
+    memory.unlink()
+
+
+class ContentScanner:
+    """Pool of worker processes scanning note contents in parallel.
+
+    The pool is started on the first parallel search. Searches only go
+    parallel with more than one worker and enough candidate notes.
+    """
+
+    def __init__(self):
+        self.workers = os.cpu_count() or 1
+        self.threshold = PARALLEL_THRESHOLD
+        self.__executor = None
+        self.__executor_workers = 0
+        # the pool may be started again after it was closed, e.g. by compaction
+        atexit.register(self.close)
+
+    def is_enabled(self, candidates_count: int) -> bool:
+        return self.workers > 1 and candidates_count >= self.threshold
+
+    def scan(self, plan: ScanPlan, criteria: str, candidates) -> set[str]:
+        """Return titles of the planned candidate notes having the criteria in them"""
+        titles = set()
+        notes_in_memory = []
+        positions = array("q")
+        for title in candidates:
+            if criteria in title:
+                titles.add(title)
+            elif title in plan.positions:
+                positions.append(plan.positions[title])
+            else:
+                notes_in_memory.append(plan.notes_in_memory[title])
+
+        shards = []
+        if len(positions) > 0:
+            executor = self.__get_executor()
+            count = len(positions)
+            shard_count = min(count, self.workers * SHARDS_PER_WORKER)
+            bounds = [count * i // shard_count for i in range(shard_count + 1)]
+            pattern = criteria.encode("utf-8")
+            for start, stop in zip(bounds, bounds[1:]):
+                future = executor.submit(
+                    scan_contents,
+                    plan.content_file.path,
+                    plan.content_file.inode,
+                    plan.memory.name,
+                    positions[start:stop],
+                    pattern,
+                )
+                shards.append((positions[start:stop], future))
+
+        # contents kept in memory are matched while the workers scan
+        titles.update(note.title for note in notes_in_memory if note.matches(criteria))
+
+        for shard, future in shards:
+            indexes = future.result()
+            if indexes is None:
+                # the snapshot was replaced by another process, its contents
+                # are only mapped here
+                indexes = [i for i in shard if criteria in plan.contents[i].read()]
+            titles.update(plan.titles[i] for i in indexes)
+        return titles
+
+    def close(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(cancel_futures=True)
+            self.__executor = None
+
+    def __get_executor(self):
+        if self.__executor is None or self.__executor_workers != self.workers:
+            # the pool is only imported when used, it slows the startup down
+            from concurrent.futures import ProcessPoolExecutor
+
+            if self.__executor is not None:
+                self.__executor.shutdown()
+            self.__executor = ProcessPoolExecutor(max_workers=self.workers)
+            self.__executor_workers = self.workers
+        return self.__executor
+
+
+content_scanner = ContentScanner()
+
+
+# The latest snapshot and plan used by the worker process, kept between searches
+_worker_snapshot = None
+_worker_plan = None
+
+
+def scan_contents(
+    path: str, inode: int, plan_name: str, positions: array, pattern: bytes
+) -> list[int] | None:
+    """Return positions of the planned contents having the pattern in them.
+
+    Runs in the worker process. UTF-8 bytes of a string contain the bytes of
+    its substring, so uncompressed contents are searched without decoding.
+    Returns None if the file at the path is not the planned snapshot anymore.
+    """
+    global _worker_snapshot, _worker_plan
+    from multiprocessing.shared_memory import SharedMemory
+
+    from .snapshot import COMPRESSIONS, get_content_codec
+
+    if _worker_snapshot is None or _worker_snapshot[0] != (path, inode):
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_ino != inode:
+                return None
+            contents = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        _worker_snapshot = ((path, inode), contents)
+
+    if _worker_plan is None or _worker_plan[0] != plan_name:
+        if _worker_plan is not None:
+            _worker_plan[2].release()
+            _worker_plan[1].close()
+        memory = SharedMemory(name=plan_name)
+        _worker_plan = (plan_name, memory, memory.buf.cast("q"))
+
+    contents = _worker_snapshot[1]
+    entries = _worker_plan[2]
+    indexes = []
+    for index in positions:
+        offset = entries[index * 3]
+        length = entries[index * 3 + 1]
+        compression_id = entries[index * 3 + 2]
+        if compression_id:
+            _, decompress = get_content_codec(COMPRESSIONS[compression_id])
+            found = pattern in decompress(contents[offset : offset + length])
+        else:
+            found = contents.find(pattern, offset, offset + length) != -1
+        if found:
+            indexes.append(index)
+    return indexes
@@ -0,0 +1,57 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from struct import Struct
+
+try:
+    import fcntl
+except ImportError:
+    # advisory locks are not available on Windows, processes are not synchronized
+    fcntl = None
+
+
+# Generation of the data and the generation its snapshot was written at
+GENERATIONS = Struct("<QQ")
+
+
+class DataLock:
+    """Advisory lock of the data files, which also keeps their generation.
+
+    The generation grows with every save, so that a process can tell whether
+    the data was changed by others since it was read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.__fd = None
+
+    @contextmanager
+    def acquire(self, exclusive: bool):
+        """Hold the lock exclusively for writing or shared for reading"""
+        if self.__fd is None:
+            self.path.parent.mkdir(exist_ok=True)
+            self.__fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        if fcntl is not None:
+            fcntl.flock(self.__fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self.__fd, fcntl.LOCK_UN)
+
+    def read_generations(self) -> tuple[int, int]:
+        os.lseek(self.__fd, 0, os.SEEK_SET)
+        data = os.read(self.__fd, GENERATIONS.size)
+        if len(data) < GENERATIONS.size:
+            return 0, 0
+        return GENERATIONS.unpack(data)
+
+    def write_generations(self, generation: int, snapshot_generation: int):
+        os.lseek(self.__fd, 0, os.SEEK_SET)
+        os.write(self.__fd, GENERATIONS.pack(generation, snapshot_generation))
+
+    def close(self):
+        if self.__fd is not None:
+            os.close(self.__fd)
+            self.__fd = None
@@ -0,0 +1,101 @@
+import csv
+import json
+from pathlib import Path
+
+from .contact_book import Contact, ContactBook
+from .note_book import Note, NoteBook
+
+
+CONTACT_FIELDS = ["name", "phones", "birthday", "email", "address"]
+NOTE_FIELDS = ["title", "content", "tags"]
+
+# Records are written through a buffer of that size
+BUFFER_SIZE = 1 << 16
+
+
+def contact_to_row(contact: Contact) -> dict:
+    return {
+        "name": contact.name.value,
+        "phones": [p.value for p in contact.phones],
+        "birthday": str(contact.birthday) if contact.birthday else None,
+        "email": contact.email.value if contact.email else None,
+        "address": contact.address.value if contact.address else None,
+    }
+
+
+def note_to_row(note: Note) -> dict:
+    return {"title": note.title, "content": note.content, "tags": list(note.tags)}
+
+
+def write_csv(file, fieldnames: list[str], rows) -> int:
+    """Write rows one by one, list values are joined with ';'"""
+    writer = csv.DictWriter(file, fieldnames=fieldnames)
+    writer.writeheader()
+
+    count = 0
+    for row in rows:
+        writer.writerow(
+            {
+                key: ";".join(value) if isinstance(value, list) else value
+                for key, value in row.items()
+            }
+        )
+        count += 1
+    return count
+
+
+def write_jsonl(file, rows) -> int:
+    count = 0
+    for row in rows:
+        file.write(json.dumps(row, ensure_ascii=False))
+        file.write("\n")
+        count += 1
+    return count
+
+
+def get_file_format(path: Path, file_format: str | None) -> str:
+    if file_format is None:
+        return "jsonl" if path.suffix.lower() in (".jsonl", ".ndjson") else "csv"
+    return file_format
+
+
+def export_records(path: str, file_format: str | None, fieldnames: list[str], rows):
+    """Stream rows to the CSV or JSONL file, guessing the format by extension"""
+    path = Path(path)
+    with open(path, "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE) as file:
+        if get_file_format(path, file_format) == "jsonl":
+            return write_jsonl(file, rows)
+        return write_csv(file, fieldnames, rows)
+
+
+def export_contacts(
+    contact_book: ContactBook,
+    path: str,
+    file_format: str | None = None,
+    criteria: str | None = None,
+) -> int:
+    """Export contacts matching the criteria (all by default), return their number"""
+    if criteria:
+        contacts = contact_book.filter(criteria)
+    else:
+        contacts = contact_book.values_by_name()
+
+    rows = (contact_to_row(contact) for contact in contacts)
+    return export_records(path, file_format, CONTACT_FIELDS, rows)
+
+
+def export_notes(
+    note_book: NoteBook,
+    path: str,
+    file_format: str | None = None,
+    tags: list[str] | None = None,
+    match_all: bool = False,
+) -> int:
+    """Export notes having the tags (all by default), return their number"""
+    if tags:
+        notes = note_book.search_by_tags(tags, match_all)
+    else:
+        notes = note_book.values_by_title()
+
+    rows = (note_to_row(note) for note in notes)
+    return export_records(path, file_format, NOTE_FIELDS, rows)
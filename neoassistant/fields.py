@@ -1,14 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime
 from abc import ABC
 import re
 
 from .errors import InvalidValueFieldError
 
 
+BIRTHDAY_PATTERN = re.compile(r"(\d\d)\.(\d\d)\.(\d\d\d\d)")
+
+
 class Field(ABC):
-    """Abstract class for fields"""
+    """Abstract class for fields.
 
-    __value = None
+    Fields keep a single slot instead of an instance dictionary, subclasses
+    may store the value in a more compact form than they expose it.
+    """
+
+    __slots__ = ("_value",)
 
     def __init__(self, value: str):
         self.value = value
@@ -16,81 +23,122 @@ class Field(ABC):
     def __str__(self):
         return str(self.value)
 
+    def __getstate__(self):
+        return self._value
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # fields pickled before slots kept a single name-mangled attribute
+            self.value = next(iter(state.values()))
+        else:
+            self._value = state
+
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, value: str):
-        self.__value = value
+        self._value = value
 
 
 class Name(Field):
     """Class for name field"""
 
+    __slots__ = ()
+
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, value: str):
         if len(value) == 0:
             raise InvalidValueFieldError("name", value, "Name cannot be empty.")
-        self.__value = value
+        self._value = value
 
 
 class Phone(Field):
-    """Class for phone field"""
+    """Class for phone field, the digits are packed into an integer"""
+
+    __slots__ = ()
 
     @property
     def value(self):
-        return self.__value
+        if isinstance(self._value, str):
+            return self._value
+        return f"{self._value:010d}"
 
     @value.setter
     def value(self, value: str):
-        if len(value) != 10 or not value.isdigit():
+        # str.isdigit() also accepts digits of other scripts and superscripts
+        if len(value) != 10 or not (value.isascii() and value.isdigit()):
             raise InvalidValueFieldError(
                 "phone", value, "Phone should contain 10 digits."
             )
 
-        self.__value = value
+        self._value = int(value)
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            state = next(iter(state.values()))
+            # phones saved before packing were checked with str.isdigit() only,
+            # the ones with other than ASCII digits are kept as they were
+            if state.isascii():
+                state = int(state)
+        super().__setstate__(state)
 
 
 class Birthday(Field):
-    """Class for birthday field"""
+    """Class for birthday field, the date is packed into its ordinal"""
+
+    __slots__ = ()
 
     @property
     def value(self):
-        return self.__value
+        return date.fromordinal(self._value)
 
     @value.setter
     def value(self, value: str):
         try:
-            parsed_date = datetime.strptime(value, "%d.%m.%Y").date()
+            match = BIRTHDAY_PATTERN.fullmatch(value)
+            if match:
+                # a shortcut for the common format which is much faster than strptime
+                day, month, year = match.groups()
+                parsed_date = date(int(year), int(month), int(day))
+            else:
+                parsed_date = datetime.strptime(value, "%d.%m.%Y").date()
         except ValueError as exc:
             raise InvalidValueFieldError(
                 "birthday", value, "Birthday should be in format DD.MM.YYYY."
             ) from exc
         else:
-            self.__value = parsed_date
+            self._value = parsed_date.toordinal()
 
     def __str__(self):
         return self.value.strftime("%d.%m.%Y")
 
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            state = next(iter(state.values())).toordinal()
+        super().__setstate__(state)
+
 
 class Email(Field):
     """Class for email field"""
 
+    __slots__ = ()
+
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, value: str):
         if not self.is_valid_email(value):
             raise InvalidValueFieldError("email", value, "Invalid email format.")
 
-        self.__value = value
+        self._value = value
 
     @staticmethod
     def is_valid_email(email):
@@ -98,16 +146,22 @@ class Email(Field):
         email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
         return re.match(email_pattern, email) is not None
 
+    @staticmethod
+    def normalize(email: str) -> str:
+        return email.strip().lower()
+
 
 class Address(Field):
     """Class for address field"""
 
+    __slots__ = ()
+
     @property
     def value(self):
-        return self.__value
+        return self._value
 
     @value.setter
     def value(self, value: str):
         if len(value.strip()) == 0:
             raise InvalidValueFieldError("address", value, "Address cannot be empty.")
-        self.__value = value
+        self._value = value
@@ -0,0 +1,197 @@
+import csv
+import re
+from itertools import islice
+from pathlib import Path
+
+from .contact_book import Contact, ContactBook
+from .errors import InvalidValueFieldError
+
+
+# Only that many error messages are kept, the rest are just counted
+MAX_ERROR_MESSAGES = 100
+
+
+class ImportResult:
+    """Summary of the contacts import"""
+
+    def __init__(self):
+        self.imported_count = 0
+        self.failed_count = 0
+        self.errors: list[str] = []
+        # set when the file could not be read to the end
+        self.stop_message: str | None = None
+
+    def __str__(self):
+        result = f"Imported {self.imported_count} contacts."
+        if self.stop_message is not None:
+            result += f"\n{self.stop_message}"
+        if self.failed_count > 0:
+            result += f"\n{self.failed_count} rows failed:\n" + "\n".join(self.errors)
+            if self.failed_count > len(self.errors):
+                result += f"\n... and {self.failed_count - len(self.errors)} more."
+        return result
+
+    def add_error(self, line_number: int, message: str):
+        self.failed_count += 1
+        if len(self.errors) < MAX_ERROR_MESSAGES:
+            self.errors.append(f"Line {line_number}: {message}")
+
+
+def decode_lines(file):
+    """Decode lines of the binary file one by one.
+
+    A text file decodes whole chunks at once, so a decoding error could not be
+    told apart from the rows before it in the same chunk.
+    """
+    for line in file:
+        yield line.decode("utf-8")
+
+
+def read_csv_rows(file):
+    """Yield (line number, row) pairs from the CSV file with a header"""
+    reader = csv.DictReader(file)
+    for row in reader:
+        row["phones"] = split_phones(row.get("phones"))
+        yield reader.line_num, row
+
+
+def read_vcard_rows(file):
+    """Yield (line number, row) pairs from the vCard file"""
+    row = None
+    start_line_number = 0
+
+    for line_number, line in enumerate(unfold_vcard_lines(file), start=1):
+        name, _, value = line.partition(":")
+        # properties may have parameters (TEL;TYPE=cell) and groups (item1.EMAIL)
+        name = name.split(";")[0].split(".")[-1].upper()
+
+        if name == "BEGIN":
+            row = {"phones": []}
+            start_line_number = line_number
+        elif row is None:
+            continue
+        elif name == "END":
+            yield start_line_number, row
+            row = None
+        elif name == "FN":
+            row["name"] = value.strip()
+        elif name == "TEL":
+            row["phones"].append(re.sub(r"[\s().-]", "", value))
+        elif name == "BDAY":
+            row["birthday"] = convert_vcard_date(value.strip())
+        elif name == "EMAIL":
+            row.setdefault("email", value.strip())
+        elif name == "ADR":
+            parts = (part.strip() for part in value.split(";"))
+            row.setdefault("address", ", ".join(part for part in parts if part))
+
+
+def unfold_vcard_lines(file):
+    """Join vCard lines continued with the leading whitespace"""
+    current = None
+    for line in file:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def convert_vcard_date(value: str) -> str:
+    """Convert YYYY-MM-DD or YYYYMMDD dates into DD.MM.YYYY"""
+    digits = value.replace("-", "")
+    if len(digits) == 8 and digits.isdigit():
+        return f"{digits[6:8]}.{digits[4:6]}.{digits[0:4]}"
+    return value
+
+
+def split_phones(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [phone for phone in re.split(r"[\s,;]+", value) if phone]
+
+
+def create_contact(row: dict) -> Contact:
+    """Create a contact from the row validating every field"""
+    name = (row.get("name") or "").strip()
+    contact = Contact(name)
+
+    for phone in row.get("phones") or []:
+        contact.set_phone(phone)
+
+    if row.get("birthday"):
+        contact.set_birthday(row["birthday"].strip())
+
+    if row.get("email"):
+        contact.set_email(row["email"].strip())
+
+    if row.get("address"):
+        contact.set_address(row["address"])
+
+    return contact
+
+
+def import_contacts(
+    contact_book: ContactBook, rows, batch_size: int = 10_000
+) -> ImportResult:
+    """Validate and add contacts from the (line number, row) pairs in batches.
+
+    Invalid rows and rows with already existing names are reported in the
+    result without stopping the import. A file which cannot be decoded or
+    parsed any further stops it, the rows read before are still imported.
+    """
+    result = ImportResult()
+    rows = iter(rows)
+    line_number = 0
+
+    while result.stop_message is None:
+        batch = []
+        try:
+            for line_number, row in islice(rows, batch_size):
+                batch.append((line_number, row))
+        except (UnicodeDecodeError, csv.Error, ValueError) as exc:
+            result.stop_message = (
+                f"The file could not be read after line {line_number}: {exc}"
+            )
+        if len(batch) == 0:
+            break
+
+        contacts = {}
+        for line_number, row in batch:
+            try:
+                contact = create_contact(row)
+            except InvalidValueFieldError as e:
+                result.add_error(line_number, e.message)
+                continue
+
+            name = contact.name.value
+            if name in contacts or name in contact_book:
+                result.add_error(line_number, f"Contact '{name}' already exists.")
+                continue
+
+            contacts[name] = contact
+
+        contact_book.add_many(contacts.values())
+        result.imported_count += len(contacts)
+
+    return result
+
+
+def import_contacts_from_file(
+    contact_book: ContactBook, path: str, file_format: str | None = None
+) -> ImportResult:
+    """Import contacts from the CSV or vCard file, guessing the format by extension"""
+    path = Path(path)
+    if file_format is None:
+        file_format = "vcard" if path.suffix.lower() in (".vcf", ".vcard") else "csv"
+
+    with open(path, "rb") as file:
+        if file_format == "vcard":
+            rows = read_vcard_rows(decode_lines(file))
+        else:
+            rows = read_csv_rows(decode_lines(file))
+        return import_contacts(contact_book, rows)
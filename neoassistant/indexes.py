@@ -0,0 +1,416 @@
+from bisect import bisect_left
+from collections import defaultdict
+
+
+# Pads indexed texts so that every character starts at least one n-gram
+PADDING = "\x00"
+
+
+class NGramIndex:
+    """Inverted index from character n-grams to keys of the indexed records.
+
+    The index only narrows the search down to candidates, the caller still has
+    to verify that a candidate really contains the searched substring.
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.postings: defaultdict[str, set] = defaultdict(set)
+
+    def __len__(self):
+        return len(self.postings)
+
+    def get_grams(self, texts) -> set[str]:
+        grams = set()
+        for text in texts:
+            text += PADDING * (self.n - 1)
+            grams.update(text[i : i + self.n] for i in range(len(text) - self.n + 1))
+        return grams
+
+    def add(self, key, texts):
+        for gram in self.get_grams(texts):
+            self.postings[gram].add(key)
+
+    def remove(self, key, texts):
+        for gram in self.get_grams(texts):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(key)
+                if len(posting) == 0:
+                    del self.postings[gram]
+
+    def get_candidates(self, substring: str) -> set:
+        if len(substring) < self.n:
+            # too short for a full n-gram, so merge postings of every n-gram
+            # starting with it; the number of distinct n-grams is bounded by
+            # the alphabet, not by the number of records
+            candidates = set()
+            for gram, posting in self.postings.items():
+                if gram.startswith(substring):
+                    candidates.update(posting)
+            return candidates
+
+        grams = {substring[i : i + self.n] for i in range(len(substring) - self.n + 1)}
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if len(candidates) == 0:
+                break
+        return candidates
+
+
+class PostingIndex:
+    """Inverted index from field values to keys of the records having them"""
+
+    def __init__(self):
+        self.postings: dict[str, set] = {}
+
+    def __len__(self):
+        return len(self.postings)
+
+    def add(self, key, values):
+        for value in values:
+            self.postings.setdefault(value, set()).add(key)
+
+    def remove(self, key, values):
+        for value in values:
+            posting = self.postings.get(value)
+            if posting is not None:
+                posting.discard(key)
+                if len(posting) == 0:
+                    del self.postings[value]
+
+    def get(self, value) -> set:
+        return self.postings.get(value, set())
+
+    def get_any(self, values) -> set:
+        """Return keys of the records having at least one of the values"""
+        keys = set()
+        for value in values:
+            keys.update(self.get(value))
+        return keys
+
+    def get_all(self, values) -> set:
+        """Return keys of the records having every one of the values"""
+        postings = sorted((self.get(value) for value in set(values)), key=len)
+        if len(postings) == 0:
+            return set()
+
+        keys = set(postings[0])
+        for posting in postings[1:]:
+            keys.intersection_update(posting)
+        return keys
+
+    def get_counts(self) -> dict:
+        """Return the number of records having each value"""
+        return {value: len(posting) for value, posting in self.postings.items()}
+
+
+class SortedKeys:
+    """Sorted list of record keys split into blocks to keep insertions cheap"""
+
+    BLOCK_SIZE = 1000
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self.blocks = [
+            keys[i : i + self.BLOCK_SIZE] for i in range(0, len(keys), self.BLOCK_SIZE)
+        ]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.length = len(keys)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return self.iterate()
+
+    def iterate(self, start: int = 0):
+        """Iterate over keys starting from the position, skipping whole blocks"""
+        for block in self.blocks:
+            if start >= len(block):
+                start -= len(block)
+                continue
+            yield from block[start:] if start > 0 else block
+            start = 0
+
+    def __contains__(self, key):
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return False
+
+        block = self.blocks[i]
+        j = bisect_left(block, key)
+        return j < len(block) and block[j] == key
+
+    def add(self, key):
+        if len(self.blocks) == 0:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            self.length = 1
+            return
+
+        i = min(bisect_left(self.maxes, key), len(self.maxes) - 1)
+        block = self.blocks[i]
+        j = bisect_left(block, key)
+        if j < len(block) and block[j] == key:
+            return
+
+        block.insert(j, key)
+        self.maxes[i] = block[-1]
+        self.length += 1
+
+        if len(block) > 2 * self.BLOCK_SIZE:
+            self.blocks[i : i + 1] = [
+                block[: self.BLOCK_SIZE],
+                block[self.BLOCK_SIZE :],
+            ]
+            self.maxes[i : i + 1] = [block[self.BLOCK_SIZE - 1], block[-1]]
+
+    def remove(self, key):
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return
+
+        block = self.blocks[i]
+        j = bisect_left(block, key)
+        if j == len(block) or block[j] != key:
+            return
+
+        del block[j]
+        self.length -= 1
+
+        if len(block) == 0:
+            del self.blocks[i]
+            del self.maxes[i]
+        else:
+            self.maxes[i] = block[-1]
+
+    def get_ordered(self, keys: set) -> list:
+        """Return the given subset of keys in sorted order"""
+        if len(keys) * 4 < self.length:
+            # a small subset is cheaper to sort than to merge against all keys
+            return sorted(keys)
+
+        return [key for key in self if key in keys]
+
+
+def levenshtein_distance(s1: str, s2: str, max_distance: int | None = None) -> int:
+    """Return the edit distance between the strings.
+
+    Columns of the edit matrix are kept as bit vectors (Myers' algorithm), so
+    every character of the longer string costs a few integer operations. With
+    max_distance, max_distance + 1 is returned as soon as the distance is known
+    to exceed it.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if max_distance is None:
+        max_distance = len(s1)
+    elif len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+
+    # the common prefix and suffix do not change the distance, and close keys
+    # (e.g. names differing in a single character) mostly consist of them
+    start = 0
+    while start < len(s2) and s1[start] == s2[start]:
+        start += 1
+    end = 0
+    while end < len(s2) - start and s1[-1 - end] == s2[-1 - end]:
+        end += 1
+    if start > 0 or end > 0:
+        s1 = s1[start : len(s1) - end]
+        s2 = s2[start : len(s2) - end]
+
+    if len(s2) == 0:
+        return len(s1)
+
+    masks = {}
+    for i, char in enumerate(s2):
+        masks[char] = masks.get(char, 0) | (1 << i)
+
+    full = (1 << len(s2)) - 1
+    last = 1 << (len(s2) - 1)
+    positive, negative, distance = full, 0, len(s2)
+    remaining = len(s1)
+
+    for char in s1:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+
+        # the distance decreases by at most one per remaining character
+        remaining -= 1
+        if distance - remaining > max_distance:
+            return max_distance + 1
+
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & full
+        negative = horizontal_positive & vertical & full
+
+    return distance
+
+
+class BKTree:
+    """Burkhard-Keller tree finding keys within an edit distance of a query.
+
+    Children are keyed by their distance to the parent, so by the triangle
+    inequality only the children within the searched distance of the query's
+    distance to the parent have to be visited.
+    """
+
+    def __init__(self, keys=()):
+        # nodes are [key, children by distance or None]
+        self.root = None
+        self.length = 0
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        return self.length
+
+    def add(self, key: str):
+        if self.root is None:
+            self.root = [key, None]
+            self.length = 1
+            return
+
+        node = self.root
+        while True:
+            distance = levenshtein_distance(key, node[0])
+            if distance == 0:
+                return
+            if node[1] is None:
+                node[1] = {}
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [key, None]
+                self.length += 1
+                return
+            node = child
+
+    def search(self, query: str, max_distance: int) -> list[tuple[int, str]]:
+        """Return (distance, key) pairs of the keys within the distance"""
+        if self.root is None:
+            return []
+
+        result = []
+        nodes = [self.root]
+        while nodes:
+            key, children = nodes.pop()
+            # farther nodes have neither matching keys nor children to visit
+            limit = max_distance + (max(children) if children else 0)
+            distance = levenshtein_distance(query, key, limit)
+            if distance <= max_distance:
+                result.append((distance, key))
+
+            if children:
+                for child_distance, child in children.items():
+                    if abs(child_distance - distance) <= max_distance:
+                        nodes.append(child)
+
+        return sorted(result)
+
+
+def get_deletions(text: str, max_distance: int) -> set[str]:
+    """Return the strings made by deleting up to max_distance characters"""
+    deletions = {text}
+    last = deletions
+    for _ in range(max_distance):
+        last = {s[:i] + s[i + 1 :] for s in last for i in range(len(s))}
+        deletions |= last
+    return deletions
+
+
+class DeletionIndex:
+    """Index finding keys within an edit distance of a query (SymSpell).
+
+    Two strings within the distance d turn into the same string by deleting
+    at most d characters from each, and so do their prefixes of any length.
+    The index maps the deletions of the key prefixes to the prefixes, so a
+    lookup only generates the deletions of the query prefix and verifies the
+    keys of the found prefixes with lengths close enough. Building it costs
+    a few dictionary insertions per distinct prefix rather than per key, so
+    the index is kept up to date on every change and on load.
+    """
+
+    PREFIX_LENGTH = 7
+
+    def __init__(self, keys=(), max_distance: int = 2):
+        self.max_distance = max_distance
+        # keys by their prefixes and lengths
+        self.keys: dict[str, dict[int, set[str]]] = {}
+        # prefixes by the strings made by deleting characters from them
+        self.prefixes: dict[str, set[str]] = {}
+        self.length = 0
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        return self.length
+
+    def add(self, key: str):
+        prefix = key[: self.PREFIX_LENGTH]
+        lengths = self.keys.get(prefix)
+        if lengths is None:
+            lengths = self.keys[prefix] = {}
+            for deletion in get_deletions(prefix, self.max_distance):
+                self.prefixes.setdefault(deletion, set()).add(prefix)
+
+        keys = lengths.setdefault(len(key), set())
+        if key not in keys:
+            keys.add(key)
+            self.length += 1
+
+    def remove(self, key: str):
+        prefix = key[: self.PREFIX_LENGTH]
+        lengths = self.keys.get(prefix, {})
+        keys = lengths.get(len(key))
+        if keys is None or key not in keys:
+            return
+
+        keys.remove(key)
+        self.length -= 1
+        if len(keys) > 0:
+            return
+
+        del lengths[len(key)]
+        if len(lengths) == 0:
+            del self.keys[prefix]
+            for deletion in get_deletions(prefix, self.max_distance):
+                prefixes = self.prefixes[deletion]
+                prefixes.discard(prefix)
+                if len(prefixes) == 0:
+                    del self.prefixes[deletion]
+
+    def search(self, query: str, max_distance: int) -> list[tuple[int, str]]:
+        """Return (distance, key) pairs of the keys within the distance"""
+        if max_distance > self.max_distance:
+            raise ValueError(
+                f"The index finds keys within the distance {self.max_distance} only."
+            )
+
+        prefixes = set()
+        for deletion in get_deletions(query[: self.PREFIX_LENGTH], max_distance):
+            prefixes.update(self.prefixes.get(deletion, ()))
+
+        result = []
+        lengths = range(len(query) - max_distance, len(query) + max_distance + 1)
+        for prefix in prefixes:
+            keys_by_length = self.keys[prefix]
+            for length in lengths:
+                for key in keys_by_length.get(length, ()):
+                    distance = levenshtein_distance(query, key, max_distance)
+                    if distance <= max_distance:
+                        result.append((distance, key))
+        return sorted(result)
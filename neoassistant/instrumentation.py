@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+
+PHASES = ("parse", "execute", "render", "save", "load")
+
+# Phases which happen before the first command are attributed to it
+STARTUP = "(startup)"
+
+
+class PhaseStats:
+    """Number of commands spending time in a phase, total and maximum durations"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+
+class Instrumentation:
+    """Durations of the command phases and optional profiles of the commands.
+
+    Measuring a phase costs a couple of perf_counter calls, commands are
+    profiled only when the directory for the profiles is set.
+    """
+
+    def __init__(self):
+        self.stats: dict[str, dict[str, PhaseStats]] = {}
+        self.calls: dict[str, int] = {}
+        self.command = STARTUP
+        self.profile_directory: Path = None
+        self.__durations: dict[str, float] = {}
+        self.__profile_count = 0
+
+    def start_command(self, name: str):
+        """Attribute the following phases to the command"""
+        self.finish_command()
+        self.command = name
+
+    def finish_command(self):
+        """Add durations of the current command phases to the stats"""
+        if len(self.__durations) == 0:
+            return
+
+        phases = self.stats.setdefault(self.command, {})
+        for phase, duration in self.__durations.items():
+            if phase not in phases:
+                phases[phase] = PhaseStats()
+            phases[phase].add(duration)
+
+        self.calls[self.command] = self.calls.get(self.command, 0) + 1
+        self.__durations = {}
+
+    def record(self, phase: str, start: float):
+        """Add the time passed since the start (a perf_counter value) to the phase"""
+        self.add(phase, perf_counter() - start)
+
+    def add(self, phase: str, duration: float):
+        """Add the duration measured elsewhere, e.g. in another thread, to the phase"""
+        self.__durations[phase] = self.__durations.get(phase, 0.0) + duration
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, start)
+
+    @contextmanager
+    def profile(self):
+        """Profile the current command into a file if profiling is enabled"""
+        if self.profile_directory is None:
+            yield
+            return
+
+        from cProfile import Profile
+
+        profiler = Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.__profile_count += 1
+            filename = f"{self.__profile_count:04d}-{self.command}.prof"
+            self.profile_directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(self.profile_directory / filename)
+
+    def format_stats(self) -> str:
+        """Format the mean and maximum durations of phases per command"""
+        if len(self.stats) == 0:
+            return "No commands measured yet."
+
+        lines = [
+            f"{'Command':<22}{'Calls':>6}"
+            + "".join(f"{phase.capitalize() + ' ms':>16}" for phase in PHASES)
+        ]
+
+        for command, phases in sorted(self.stats.items()):
+            line = f"{command:<22}{self.calls[command]:>6}"
+            for phase in PHASES:
+                stats = phases.get(phase)
+                if stats is None:
+                    line += f"{'-':>16}"
+                else:
+                    mean = stats.total / stats.count * 1000
+                    line += f"{f'{mean:.2f}/{stats.max * 1000:.2f}':>16}"
+            lines.append(line.rstrip())
+
+        lines.append("Durations are mean/max per command call.")
+        return "\n".join(lines)
+
+
+instrumentation = Instrumentation()
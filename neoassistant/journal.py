@@ -0,0 +1,96 @@
+import os
+from pathlib import Path
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from struct import Struct
+from zlib import crc32
+
+
+# Every record is framed as <payload length><payload crc32><payload>
+RECORD_HEADER = Struct("<II")
+
+
+def encode_record(record) -> tuple[bytes, int]:
+    """Return the payload of the record and its checksum, which is also its hash"""
+    payload = dumps(record, protocol=HIGHEST_PROTOCOL)
+    return payload, crc32(payload)
+
+
+class Journal:
+    """Append-only journal of record-level changes"""
+
+    def __init__(self, path: Path, group_size: int = 32):
+        self.path = path
+        self.group_size = group_size
+        self.record_count = 0
+        # end of the last complete record, changes of other processes follow it
+        self.size = 0
+        self.__file = None
+        self.__pending = 0
+
+    def replay(self, offset: int = 0):
+        """Yield every complete record stored after the offset with its checksum"""
+        if not self.path.exists():
+            return
+
+        valid_size = offset
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            while True:
+                header = file.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+
+                size, checksum = RECORD_HEADER.unpack(header)
+                payload = file.read(size)
+
+                # a torn or corrupted tail is left over from a crash mid-write
+                if len(payload) < size or crc32(payload) != checksum:
+                    break
+
+                valid_size = file.tell()
+                self.size = valid_size
+                self.record_count += 1
+                yield loads(payload), checksum
+
+        # cut the broken tail off so that new records are appended after valid ones
+        if self.path.stat().st_size > valid_size:
+            os.truncate(self.path, valid_size)
+
+    def append(self, records: list[tuple[bytes, int]]):
+        """Append records encoded by encode_record"""
+        if len(records) == 0:
+            return
+
+        if self.__file is None:
+            self.path.parent.mkdir(exist_ok=True)
+            self.__file = open(self.path, "ab")
+
+        for payload, checksum in records:
+            self.__file.write(RECORD_HEADER.pack(len(payload), checksum))
+            self.__file.write(payload)
+
+        self.__file.flush()
+        self.size = self.__file.tell()
+        self.record_count += len(records)
+        self.__pending += len(records)
+
+        if self.__pending >= self.group_size:
+            self.sync()
+
+    def sync(self):
+        if self.__file is not None and self.__pending > 0:
+            os.fsync(self.__file.fileno())
+            self.__pending = 0
+
+    def reset(self):
+        """Drop all records, e.g. after they were compacted into a snapshot"""
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.record_count = 0
+        self.size = 0
+
+    def close(self):
+        if self.__file is not None:
+            self.sync()
+            self.__file.close()
+            self.__file = None
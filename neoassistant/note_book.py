@@ -1,5 +1,9 @@
 from collections import UserDict
+from sys import intern
 
+from .content_scanner import STALE_PLAN_SHARE, ScanPlan, content_scanner
+from .indexes import DeletionIndex, NGramIndex, PostingIndex, SortedKeys
+from .render_cache import render_cache
 from .rich_formatter import RichFormatter
 
 
@@ -7,12 +11,59 @@ formatter = RichFormatter()
 
 
 class Note:
-    def __init__(self, title: str, content: str, tags: list[str]):
+    # weak references are taken by the render cache
+    __slots__ = ("title", "_content", "_tags", "__weakref__")
+
+    def __init__(self, title: str, content, tags: list[str]):
         self.title = title
         self.content = content
         self.tags = tags
 
+    def __getstate__(self):
+        return (self.title, self.content, self._tags)
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # notes pickled before slots kept an instance dictionary
+            state = (state["title"], state["content"], state["tags"])
+
+        self.title, self.content, self.tags = state
+
+    @property
+    def content(self) -> str:
+        content = self._content
+        if type(content) is not str:
+            # contents stored in the snapshot are read on demand and not kept
+            content = content.read()
+        return content
+
+    @content.setter
+    def content(self, content):
+        # either a string or a reference to the stored content with the read method
+        self._content = content
+
+    @property
+    def stored_content(self):
+        """Reference to the content in the snapshot, None if it is kept in memory"""
+        return None if type(self._content) is str else self._content
+
+    @property
+    def tags(self) -> tuple[str, ...]:
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags: list[str]):
+        # the same few tags are shared by many notes
+        self._tags = tuple(intern(tag) for tag in tags)
+
     def __str__(self):
+        result = render_cache.get(self)
+        if result is None:
+            result = self.__render()
+            render_cache.put(self, result)
+        return result
+
+    def __render(self) -> str:
         result = f"{formatter.format_field_value_pair('Title', self.title)}\n"
 
         if len(self.content) > 0:
@@ -24,23 +75,67 @@ class Note:
             )
         return result
 
+    def get_search_values(self) -> list[str]:
+        """Return field values matched by the notes search"""
+        return [self.title, self.content]
+
+    def matches(self, criteria: str) -> bool:
+        return criteria in self.title or criteria in self.content
+
 
 class NoteBook(UserDict):
+    def __init__(self):
+        super().__init__()
+        self.__changes = set()
+        self.__create_indexes()
+
+    def __getstate__(self):
+        # indexes are cheaper to rebuild on load than to persist
+        return {"data": self.data}
+
+    def __setstate__(self, state):
+        self.data = state["data"]
+        self.__changes = set()
+        self.__create_indexes()
+        for note in self.data.values():
+            self.__index(note)
+
     def __str__(self):
         if len(self.data) == 0:
             return "Notebook is empty."
 
-        return "\n".join(str(note) for note in self.sort_by_title(self.data.values()))
+        return "\n".join(str(note) for note in self.values_by_title())
+
+    def values_by_title(self, offset: int = 0):
+        """Iterate over notes in the order of their titles"""
+        return (self.data[title] for title in self.__titles.iterate(offset))
 
     def add_record(self, note: Note):
+        self.delete(note.title)
         self.data[note.title] = note
+        self.__titles.add(note.title)
+        self.__similar_titles.add(note.title)
+        self.__index(note)
+        self.__changes.add(note.title)
 
     def find_by_title(self, title: str) -> Note:
         return self.data[title] if title in self.data else None
 
+    def get_similar_titles(
+        self, title: str, max_distance: int = 2, limit: int = 5
+    ) -> list[str]:
+        """Return the closest titles within the edit distance of the misspelled one"""
+        similar = self.__similar_titles.search(title, max_distance)
+        return [title for _, title in similar][:limit]
+
     def delete(self, title: str):
         if title in self.data:
-            self.data.pop(title)
+            self.__titles.remove(title)
+            self.__similar_titles.remove(title)
+            note = self.data.pop(title)
+            self.__unindex(note)
+            render_cache.invalidate(note)
+            self.__changes.add(title)
 
     def change(
         self,
@@ -51,6 +146,9 @@ class NoteBook(UserDict):
     ):
         note = self.find_by_title(current_title)
         if note:
+            self.__unindex(note)
+            render_cache.invalidate(note)
+
             if title:
                 note.title = title
             if content:
@@ -59,28 +157,97 @@ class NoteBook(UserDict):
                 note.tags = tags
 
             if title and title != current_title:
+                self.delete(title)
                 self.data[title] = note
                 self.data.pop(current_title)
+                self.__titles.remove(current_title)
+                self.__titles.add(title)
+                self.__similar_titles.remove(current_title)
+                self.__similar_titles.add(title)
+                self.__changes.add(title)
 
-    def search(self, criteria: str) -> list[Note]:
-        return self.sort_by_title(
-            list(
-                filter(
-                    lambda note: criteria in note.title or criteria in note.content,
-                    self.data.values(),
-                )
-            )
-        )
-
-    def search_by_tags(self, tags: list[str]) -> list[Note]:
-        return self.sort_by_title(
-            list(
-                filter(
-                    lambda note: any(tag in note.tags for tag in tags),
-                    self.data.values(),
-                )
-            )
-        )
+            self.__index(note)
+            self.__changes.add(current_title)
 
-    def sort_by_title(self, notes: list[Note]):
-        return sorted(notes, key=lambda note: note.title)
+    def pop_changes(self) -> set[str]:
+        """Return titles of notes changed since the previous call"""
+        changes, self.__changes = self.__changes, set()
+        return changes
+
+    def search(self, criteria: str) -> list[Note]:
+        if self.__search_index is None:
+            # built on the first search, so that loading does not read the contents
+            self.__search_index = NGramIndex()
+            for note in self.data.values():
+                self.__search_index.add(note.title, note.get_search_values())
+
+        candidates = self.__search_index.get_candidates(criteria)
+        if content_scanner.is_enabled(len(candidates)):
+            titles = self.__scan(criteria, candidates)
+        else:
+            titles = {
+                title for title in candidates if self.data[title].matches(criteria)
+            }
+        return self.__get_ordered(titles)
+
+    def search_by_tags(self, tags: list[str], match_all: bool = False) -> list[Note]:
+        if match_all:
+            titles = self.__tag_index.get_all(tags)
+        else:
+            titles = self.__tag_index.get_any(tags)
+
+        return self.__get_ordered(titles)
+
+    def get_tag_counts(self) -> dict[str, int]:
+        """Return the number of notes for every tag"""
+        return self.__tag_index.get_counts()
+
+    def reset_scan_plan(self):
+        """Drop the plan of the parallel search, e.g. after contents were moved"""
+        if self.__scan_plan is not None:
+            self.__scan_plan.close()
+        self.__scan_plan = None
+        self.__unplanned = set()
+
+    def __scan(self, criteria: str, candidates: set[str]) -> set[str]:
+        """Check the candidate notes in parallel with the worker processes"""
+        if (
+            self.__scan_plan is None
+            or len(self.__unplanned) > len(self.data) * STALE_PLAN_SHARE
+        ):
+            self.reset_scan_plan()
+            self.__scan_plan = ScanPlan(self.data.values())
+
+        planned = candidates - self.__unplanned
+        titles = content_scanner.scan(self.__scan_plan, criteria, planned)
+
+        # notes changed since the plan was built are matched here
+        for title in candidates & self.__unplanned:
+            if self.data[title].matches(criteria):
+                titles.add(title)
+        return titles
+
+    def __get_ordered(self, titles: set[str]) -> list[Note]:
+        return [self.data[title] for title in self.__titles.get_ordered(titles)]
+
+    def __create_indexes(self):
+        self.__titles = SortedKeys(self.data)
+        self.__similar_titles = DeletionIndex(self.data)
+        self.__search_index: NGramIndex = None
+        self.__tag_index = PostingIndex()
+        self.__scan_plan: ScanPlan = None
+        self.__unplanned: set[str] = set()
+
+    def __index(self, note: Note):
+        if self.__scan_plan is not None:
+            self.__unplanned.add(note.title)
+        if self.__search_index is not None:
+            self.__search_index.add(note.title, note.get_search_values())
+        self.__tag_index.add(note.title, note.tags)
+
+    def __unindex(self, note: Note):
+        if self.__scan_plan is not None:
+            self.__unplanned.add(note.title)
+        if self.__search_index is not None:
+            self.__search_index.remove(note.title, note.get_search_values())
+        self.__tag_index.remove(note.title, note.tags)
@@ -0,0 +1,61 @@
+import weakref
+from collections import OrderedDict
+
+
+# Total length of the cached strings, the least recently used are evicted beyond it
+RENDER_CACHE_SIZE = 16 * 1024 * 1024
+
+
+class RenderCache:
+    """LRU cache of the formatted strings of records.
+
+    Records are kept by their ids together with weak references to them, so
+    the cache does not keep records alive: strings of the records created for
+    a single query (as the SQLite backend does) are dropped as soon as the
+    records are, before their ids can be reused. Records drop their strings
+    from the cache whenever their fields change.
+    """
+
+    def __init__(self, max_size: int = RENDER_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.__entries: OrderedDict[int, tuple[weakref.ref, str]] = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, record) -> str | None:
+        entry = self.__entries.get(id(record))
+        if entry is None:
+            return None
+
+        self.__entries.move_to_end(id(record))
+        return entry[1]
+
+    def put(self, record, rendered: str):
+        if len(rendered) > self.max_size:
+            return
+
+        self.invalidate(record)
+        key = id(record)
+        reference = weakref.ref(record, lambda _: self.__discard(key))
+        self.__entries[key] = (reference, rendered)
+        self.size += len(rendered)
+        while self.size > self.max_size:
+            _, (_, evicted) = self.__entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def invalidate(self, record):
+        self.__discard(id(record))
+
+    def clear(self):
+        self.__entries.clear()
+        self.size = 0
+
+    def __discard(self, key: int):
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+render_cache = RenderCache()
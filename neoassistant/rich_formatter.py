@@ -1,27 +1,74 @@
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
-from rich.padding import Padding
+import re
+
+
+# Markup tags as rich parses them, with the backslashes escaping them
+MARKUP_TAG_PATTERN = re.compile(r"(\\*)(\[[a-z#/@][^[]*?])")
+
+
+def strip_markup(text: str) -> str:
+    """Return the text without rich markup tags, keeping the escaped ones.
+
+    Plain output does not import rich, which slows the startup down.
+    """
+
+    def replace(match):
+        backslashes, escaped = divmod(len(match.group(1)), 2)
+        return "\\" * backslashes + (match.group(2) if escaped else "")
+
+    return MARKUP_TAG_PATTERN.sub(replace, text)
+
+
+def escape_markup(text: str) -> str:
+    """Escape the text so that rich prints it as it is"""
+    text = MARKUP_TAG_PATTERN.sub(r"\1\1\\\2", text)
+    if text.endswith("\\") and not text.endswith("\\\\"):
+        # a trailing backslash would escape a tag following the text
+        text += "\\"
+    return text
 
 
 class RichFormatter:
     __instance = None
+    __console = None
 
     def __new__(cls):
         if not cls.__instance:
             cls.__instance = super(RichFormatter, cls).__new__(cls)
         return cls.__instance
 
-    def __init__(self):
-        self.console = Console()
+    @property
+    def console(self):
+        """Console created on the first output, rich is imported only then"""
+        if RichFormatter.__console is None:
+            from rich.console import Console
+
+            RichFormatter.__console = Console()
+        return RichFormatter.__console
 
     def print(self, text, style=None):
         self.console.print(text, style=style)
 
+    def print_result(self, result):
+        """Print a command result, which is a string or an iterator of chunks"""
+        if isinstance(result, str):
+            self.print(f"\n{result}")
+            return
+
+        self.print("")
+        for chunk in result:
+            self.print(chunk)
+
+    def to_plain(self, text: str) -> str:
+        return strip_markup(text)
+
     def input(self, text):
         return self.console.input(text)
 
     def format_command_list(self, commands):
+        from rich.padding import Padding
+        from rich.table import Table
+        from rich.text import Text
+
         table = Table(title="Available Commands")
         table.add_column("Command", style="bold")
         table.add_column("Description")
@@ -0,0 +1,175 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from time import perf_counter
+
+from .assistant import Assistant
+from .batch import get_exception_result
+from .commands import ErrorResult, get_command, get_suggested_commands, parse_input
+from .instrumentation import instrumentation
+from .rich_formatter import RichFormatter
+
+
+# Port of the server when only the host is given
+DEFAULT_PORT = 8765
+
+# Seconds a client may take to receive a message before it is dropped
+SEND_TIMEOUT = 30
+
+
+def parse_address(address: str) -> tuple[str, tuple]:
+    """Parse 'unix:PATH', 'HOST:PORT', 'HOST' or 'PORT' into the family and address.
+
+    TCP servers listen on localhost unless another host is given.
+    """
+    if address.startswith("unix:"):
+        return "unix", (address[len("unix:") :],)
+
+    host, _, port = address.rpartition(":")
+    if not host and not port.isdigit():
+        host, port = port, ""
+    return "tcp", (host or "127.0.0.1", int(port) if port else DEFAULT_PORT)
+
+
+class AssistantServer:
+    """Serves commands of many clients from a single loaded assistant.
+
+    A request is a command line. The response is a sequence of JSON lines:
+    {"output": chunk} for every chunk of the result (in the rich markup),
+    {"error": message} for the failed command, {"text": text} for text printed
+    by the command, and finally
+    {"done": true, "ok": bool, "exit": bool}.
+
+    Commands of all the clients are executed one at a time in a thread of
+    their own, as the books and their lazily built indexes are not safe to
+    share between threads, while the event loop keeps serving the clients.
+    Commands changing the books are saved before the next command starts.
+    The whole response is rendered in that thread and sent afterwards, and
+    clients not receiving a message within SEND_TIMEOUT seconds are dropped,
+    so slow clients do not hold the other ones up.
+    """
+
+    def __init__(self, assistant: Assistant, data_filename: str):
+        self.assistant = assistant
+        self.data_filename = data_filename
+        self.formatter = RichFormatter()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def close(self):
+        """Wait for the command being executed, e.g. before the books are saved"""
+        self.executor.shutdown()
+        instrumentation.finish_command()
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while line := await reader.readline():
+                is_final = await self.handle_command(line, writer)
+                if is_final:
+                    break
+        except ConnectionError:
+            pass
+        except asyncio.TimeoutError:
+            # the unsent data would keep the connection from closing
+            writer.transport.abort()
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def handle_command(self, line: bytes, writer: asyncio.StreamWriter) -> bool:
+        """Execute the command line and send the response, return if it was final"""
+        start = perf_counter()
+        try:
+            command_name, *args = parse_input(line.decode("utf-8").strip())
+        except ValueError as exc:
+            # undecodable lines as well as unbalanced quotes
+            return await self.send_error(writer, f"[red]{exc}[/red]")
+
+        command = get_command(command_name)
+        if command is None:
+            suggested_commands = get_suggested_commands(command_name)
+            message = "[red]Unknown command.[/red]"
+            if len(suggested_commands) > 0:
+                message += f" Did you mean: {', '.join(suggested_commands)}?"
+            return await self.send_error(writer, message)
+
+        parse_duration = perf_counter() - start
+        messages = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.execute, command, args, parse_duration
+        )
+
+        for message in messages:
+            await self.send(writer, message)
+        return command.is_final
+
+    def execute(self, command, args: list[str], parse_duration: float) -> list[dict]:
+        """Execute the command and return the messages of the whole response.
+
+        Unexpected exceptions of the command or of saving are sent as errors,
+        so that the client gets a response rather than a dropped connection.
+        The phases are measured here, as the stats are not shared between threads.
+        """
+        instrumentation.start_command(command.name)
+        instrumentation.add("parse", parse_duration)
+        messages = []
+        try:
+            with instrumentation.profile():
+                # commands like help print right away instead of returning it
+                with self.formatter.console.capture() as capture:
+                    result = command.execute(self.assistant, args)
+                if text := capture.get():
+                    messages.append({"text": text})
+
+                if isinstance(result, ErrorResult):
+                    messages.append({"error": result})
+                else:
+                    # listings are rendered lazily, so the books are read right here
+                    with instrumentation.measure("render"):
+                        for chunk in [result] if isinstance(result, str) else result:
+                            messages.append({"output": chunk})
+        except Exception as exc:
+            result = get_exception_result(exc)
+            messages.append({"error": result})
+
+        if command.changes_data:
+            # saved even after a failure, the command may have changed the books
+            try:
+                with instrumentation.measure("save"):
+                    self.assistant.save(self.data_filename)
+            except Exception as exc:
+                result = get_exception_result(exc)
+                messages.append({"error": result})
+
+        ok = not isinstance(result, ErrorResult)
+        messages.append({"done": True, "ok": ok, "exit": command.is_final})
+        return messages
+
+    async def send(self, writer: asyncio.StreamWriter, message: dict):
+        writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        await asyncio.wait_for(writer.drain(), SEND_TIMEOUT)
+
+    async def send_error(self, writer: asyncio.StreamWriter, message: str) -> bool:
+        await self.send(writer, {"error": message})
+        await self.send(writer, {"done": True, "ok": False, "exit": False})
+        return False
+
+
+async def serve(assistant: Assistant, data_filename: str, address: str):
+    """Serve commands on the Unix socket or TCP address until cancelled"""
+    assistant_server = AssistantServer(assistant, data_filename)
+    handler = assistant_server.handle_client
+    family, arguments = parse_address(address)
+
+    if family == "unix":
+        server = await asyncio.start_unix_server(handler, *arguments)
+    else:
+        server = await asyncio.start_server(handler, *arguments)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        assistant_server.close()
@@ -0,0 +1,190 @@
+import mmap
+import os
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from pickle import HIGHEST_PROTOCOL, Pickler, Unpickler, load
+from struct import Struct
+
+from .note_book import Note
+
+
+# Snapshots starting with it keep note contents in front of the pickled assistant,
+# older snapshots are plain pickles
+MAGIC = b"NEOSNAP2"
+
+# Magic, the offset of the pickle and the compression of the pickle
+HEADER = Struct("<8sQB7x")
+
+# Compressions by their ids in the header
+COMPRESSIONS = (None, "zlib", "lzma")
+
+# Shorter contents are stored as they are, compressing them hardly saves space
+MIN_COMPRESSED_LENGTH = 128
+
+# Number of decompressed contents kept for repeated reads
+CONTENT_CACHE_SIZE = 128
+
+
+def get_content_codec(compression: str):
+    """Return compress and decompress functions of the compression"""
+    if compression == "zlib":
+        return zlib.compress, zlib.decompress
+
+    # lzma and gzip are only imported when used, they slow the startup down
+    import lzma
+
+    return lzma.compress, lzma.decompress
+
+
+def open_pickle_stream(file, mode: str, compression: str):
+    """Wrap the file into a stream compressing the pickle written into it"""
+    if compression == "zlib":
+        from gzip import GzipFile
+
+        return GzipFile(fileobj=file, mode=mode)
+
+    from lzma import LZMAFile
+
+    return LZMAFile(file, mode)
+
+
+class ContentFile:
+    """Snapshot file mapped into memory, so that note contents are paged in on read"""
+
+    def __init__(self, path: Path, cache_size: int = CONTENT_CACHE_SIZE):
+        self.path = str(path)
+        self.__file = open(path, "rb")
+        # tells the mapped file apart from the snapshot written over it later
+        self.inode = os.fstat(self.__file.fileno()).st_ino
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__cache: OrderedDict[int, str] = OrderedDict()
+        self.cache_size = cache_size
+
+    def read(self, offset: int, length: int, compression: str = None) -> str:
+        if compression is None:
+            return self.__mmap[offset : offset + length].decode("utf-8")
+
+        content = self.__cache.get(offset)
+        if content is not None:
+            self.__cache.move_to_end(offset)
+            return content
+
+        _, decompress = get_content_codec(compression)
+        content = decompress(self.__mmap[offset : offset + length]).decode("utf-8")
+        self.__cache[offset] = content
+        if len(self.__cache) > self.cache_size:
+            self.__cache.popitem(last=False)
+        return content
+
+    def close(self):
+        self.__mmap.close()
+        self.__file.close()
+
+
+class StoredContent:
+    """Reference to the note content in the snapshot file"""
+
+    __slots__ = ("file", "offset", "length", "compression")
+
+    def __init__(
+        self, file: ContentFile, offset: int, length: int, compression: str = None
+    ):
+        self.file = file
+        self.offset = offset
+        self.length = length
+        self.compression = compression
+
+    def read(self) -> str:
+        return self.file.read(self.offset, self.length, self.compression)
+
+
+class SnapshotPickler(Pickler):
+    """Pickler writing notes as references to their contents stored before"""
+
+    def __init__(self, file, offsets: dict[int, tuple]):
+        super().__init__(file, protocol=HIGHEST_PROTOCOL)
+        self.offsets = offsets
+
+    def persistent_id(self, obj):
+        if type(obj) is Note:
+            return (obj.title, obj.tags, *self.offsets[id(obj)])
+        return None
+
+
+class SnapshotUnpickler(Unpickler):
+    def __init__(self, file, content_file: ContentFile):
+        super().__init__(file)
+        self.content_file = content_file
+
+    def persistent_load(self, pid):
+        title, tags, offset, length, compression = pid
+        content = StoredContent(self.content_file, offset, length, compression)
+        return Note(title, content, tags)
+
+
+def write_snapshot(
+    path: Path, assistant, notes, compression: str = None
+) -> dict[int, tuple]:
+    """Write note contents and then the pickled assistant referring to them.
+
+    With compression both the pickle and every content long enough are
+    compressed. Returns (offset, length, compression) of the contents by ids
+    of the notes.
+    """
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, 0, 0))
+
+        offsets = {}
+        offset = HEADER.size
+        compress = None
+        if compression:
+            compress, _ = get_content_codec(compression)
+
+        for note in notes:
+            content = note.content.encode("utf-8")
+            content_compression = None
+            if compress is not None and len(content) >= MIN_COMPRESSED_LENGTH:
+                compressed = compress(content)
+                if len(compressed) < len(content):
+                    content, content_compression = compressed, compression
+
+            file.write(content)
+            offsets[id(note)] = (offset, len(content), content_compression)
+            offset += len(content)
+
+        if compression:
+            with open_pickle_stream(file, "wb", compression) as stream:
+                SnapshotPickler(stream, offsets).dump(assistant)
+        else:
+            SnapshotPickler(file, offsets).dump(assistant)
+
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, offset, COMPRESSIONS.index(compression)))
+        file.flush()
+        os.fsync(file.fileno())
+
+    return offsets
+
+
+def read_snapshot(path: Path):
+    """Return the pickled assistant and the file its note contents are read from.
+
+    The file is None for snapshots written before the contents were stored apart.
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if header[: len(MAGIC)] != MAGIC:
+            file.seek(0)
+            return load(file), None
+
+        _, offset, compression_id = HEADER.unpack(header)
+        compression = COMPRESSIONS[compression_id]
+        content_file = ContentFile(path)
+        file.seek(offset)
+        if compression:
+            with open_pickle_stream(file, "rb", compression) as stream:
+                content = SnapshotUnpickler(stream, content_file).load()
+        else:
+            content = SnapshotUnpickler(file, content_file).load()
+        return content, content_file
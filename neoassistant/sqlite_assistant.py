@@ -0,0 +1,549 @@
+import sqlite3
+from datetime import date, datetime
+
+from .assistant import Assistant, get_data_path
+from .contact_book import (
+    Contact,
+    ContactBook,
+    format_birthdays,
+    get_upcoming_days,
+)
+from .fields import Address, Birthday, Email, Phone
+from .indexes import DeletionIndex, get_deletions, levenshtein_distance
+from .note_book import Note, NoteBook
+
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS contacts (
+    name TEXT PRIMARY KEY,
+    birthday TEXT,
+    birthday_month_day TEXT,
+    email TEXT,
+    address TEXT
+);
+CREATE INDEX IF NOT EXISTS contacts_birthday_month_day
+    ON contacts (birthday_month_day);
+CREATE INDEX IF NOT EXISTS contacts_email ON contacts (lower(trim(email)));
+
+CREATE TABLE IF NOT EXISTS phones (
+    contact_name TEXT NOT NULL REFERENCES contacts (name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (contact_name, position)
+);
+CREATE INDEX IF NOT EXISTS phones_value ON phones (value);
+
+CREATE TABLE IF NOT EXISTS notes (
+    title TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tags (
+    note_title TEXT NOT NULL REFERENCES notes (title) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (note_title, position)
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+
+CREATE INDEX IF NOT EXISTS contacts_name_prefix
+    ON contacts (substr(name, 1, {DeletionIndex.PREFIX_LENGTH}));
+CREATE TABLE IF NOT EXISTS name_deletions (
+    deletion TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    PRIMARY KEY (deletion, prefix)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS notes_title_prefix
+    ON notes (substr(title, 1, {DeletionIndex.PREFIX_LENGTH}));
+CREATE TABLE IF NOT EXISTS title_deletions (
+    deletion TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    PRIMARY KEY (deletion, prefix)
+) WITHOUT ROWID;
+"""
+
+# Deletions of the key prefixes are stored for the edits up to that distance
+SIMILARITY_DISTANCE = 2
+# Values bound to a single statement, well below the SQLite limit
+MAX_PARAMETERS = 500
+
+# Separates phones and tags aggregated into a single column
+SEPARATOR = "\x1f"
+
+CONTACT_SELECT = f"""
+SELECT name, birthday, email, address, (
+    SELECT group_concat(value, '{SEPARATOR}') FROM (
+        SELECT value FROM phones WHERE contact_name = name ORDER BY position
+    )
+) FROM contacts
+"""
+
+NOTE_SELECT = f"""
+SELECT title, content, (
+    SELECT group_concat(tag, '{SEPARATOR}') FROM (
+        SELECT tag FROM tags WHERE note_title = title ORDER BY position
+    )
+) FROM notes
+"""
+
+
+class SimilarKeys:
+    """Deletion index of the keys of a table kept in the database.
+
+    The same index as DeletionIndex: the deletions of the key prefixes are
+    stored along with the prefixes, and the keys are found by the expression
+    index on their prefixes. Deletions of the prefixes no key has anymore are
+    kept, they only make the lookups find no keys for them.
+    """
+
+    def __init__(
+        self, connection: sqlite3.Connection, table: str, column: str, deletions: str
+    ):
+        self.connection = connection
+        self.table = table
+        self.column = column
+        self.deletions = deletions
+        # the same expression as in the index on the prefixes, so that it is used
+        self.prefix = f"substr({column}, 1, {DeletionIndex.PREFIX_LENGTH})"
+
+        cursor = connection.execute(f"SELECT 1 FROM {deletions} LIMIT 1")
+        if cursor.fetchone() is None:
+            # databases created before the index have their keys added once
+            cursor = connection.execute(f"SELECT DISTINCT {self.prefix} FROM {table}")
+            for (prefix,) in cursor.fetchall():
+                self.__add_prefix(prefix)
+
+    def add(self, key: str):
+        prefix = key[: DeletionIndex.PREFIX_LENGTH]
+        cursor = self.connection.execute(
+            f"SELECT 1 FROM {self.deletions} WHERE deletion = ? AND prefix = ?",
+            (prefix, prefix),
+        )
+        if cursor.fetchone() is None:
+            self.__add_prefix(prefix)
+
+    def search(self, query: str, max_distance: int) -> list[tuple[int, str]]:
+        """Return (distance, key) pairs of the keys within the distance"""
+        if max_distance > SIMILARITY_DISTANCE:
+            raise ValueError(
+                f"The index finds keys within the distance {SIMILARITY_DISTANCE} only."
+            )
+
+        deletions = tuple(
+            get_deletions(query[: DeletionIndex.PREFIX_LENGTH], max_distance)
+        )
+        cursor = self.connection.execute(
+            f"""
+            SELECT DISTINCT prefix FROM {self.deletions}
+            WHERE deletion IN ({", ".join("?" * len(deletions))})
+            """,
+            deletions,
+        )
+        prefixes = [prefix for prefix, in cursor]
+
+        keys = []
+        # the expression index is only used for a list of values, not a subquery
+        for i in range(0, len(prefixes), MAX_PARAMETERS):
+            chunk = prefixes[i : i + MAX_PARAMETERS]
+            cursor = self.connection.execute(
+                f"""
+                SELECT {self.column} FROM {self.table}
+                WHERE {self.prefix} IN ({", ".join("?" * len(chunk))})
+                AND length({self.column}) BETWEEN ? AND ?
+                """,
+                (*chunk, len(query) - max_distance, len(query) + max_distance),
+            )
+            keys.extend(key for key, in cursor)
+
+        result = []
+        for key in keys:
+            distance = levenshtein_distance(query, key, max_distance)
+            if distance <= max_distance:
+                result.append((distance, key))
+        return sorted(result)
+
+    def __add_prefix(self, prefix: str):
+        self.connection.executemany(
+            f"INSERT OR IGNORE INTO {self.deletions} VALUES (?, ?)",
+            (
+                (deletion, prefix)
+                for deletion in get_deletions(prefix, SIMILARITY_DISTANCE)
+            ),
+        )
+
+
+class SqliteContactBook(ContactBook):
+    """Contact book which keeps contacts in the SQLite database"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        super().__init__()
+        self.connection = connection
+        self.__similar_names = SimilarKeys(
+            connection, "contacts", "name", "name_deletions"
+        )
+
+    def __str__(self) -> str:
+        if len(self) == 0:
+            return "Contact book is empty."
+
+        return "\n".join(str(record) for record in self.values())
+
+    def __len__(self):
+        return self.connection.execute("SELECT count(*) FROM contacts").fetchone()[0]
+
+    def __iter__(self):
+        cursor = self.connection.execute("SELECT name FROM contacts ORDER BY name")
+        return (name for name, in cursor)
+
+    def __contains__(self, name):
+        cursor = self.connection.execute(
+            "SELECT 1 FROM contacts WHERE name = ?", (name,)
+        )
+        return cursor.fetchone() is not None
+
+    def __getitem__(self, name):
+        contact = self.find(name)
+        if contact is None:
+            raise KeyError(name)
+        return contact
+
+    def values(self):
+        return self.__select("ORDER BY name")
+
+    def values_by_name(self, offset: int = 0):
+        return self.__select("ORDER BY name LIMIT -1 OFFSET ?", (offset,))
+
+    def add(self, contact: Contact):
+        self.delete(contact.name.value)
+        self.connection.execute(
+            "INSERT INTO contacts VALUES (?, NULL, NULL, NULL, NULL)",
+            (contact.name.value,),
+        )
+        self.after_update(contact)
+        contact.book = self
+        self.__similar_names.add(contact.name.value)
+
+    def add_many(self, contacts):
+        contacts = list(contacts)
+        self.connection.executemany(
+            "INSERT INTO contacts VALUES (?, ?, ?, ?, ?)",
+            (self.__get_row(contact) for contact in contacts),
+        )
+        self.connection.executemany(
+            "INSERT INTO phones VALUES (?, ?, ?)",
+            (
+                (contact.name.value, position, p.value)
+                for contact in contacts
+                for position, p in enumerate(contact.phones)
+            ),
+        )
+        for contact in contacts:
+            contact.book = self
+            self.__similar_names.add(contact.name.value)
+
+    def find(self, name: str) -> Contact:
+        return next(self.__select("WHERE name = ?", (name,)), None)
+
+    def find_by_phone(self, phone: str) -> list[Contact]:
+        return list(
+            self.__select(
+                """
+                WHERE name IN (SELECT contact_name FROM phones WHERE value = ?)
+                ORDER BY name
+                """,
+                (Phone(phone).value,),
+            )
+        )
+
+    def find_by_email(self, email: str) -> list[Contact]:
+        return list(
+            self.__select(
+                "WHERE lower(trim(email)) = ? ORDER BY name",
+                (Email(Email.normalize(email)).value,),
+            )
+        )
+
+    def get_similar_names(
+        self, name: str, max_distance: int = 2, limit: int = 5
+    ) -> list[str]:
+        similar = self.__similar_names.search(name, max_distance)
+        return [name for _, name in similar][:limit]
+
+    def delete(self, name: str):
+        self.connection.execute("DELETE FROM contacts WHERE name = ?", (name,))
+
+    def before_update(self, contact: Contact):
+        pass
+
+    def after_update(self, contact: Contact):
+        name, *values = self.__get_row(contact)
+
+        self.connection.execute(
+            """
+            UPDATE contacts SET birthday = ?, birthday_month_day = ?, email = ?, address = ?
+            WHERE name = ?
+            """,
+            (*values, name),
+        )
+        self.connection.execute("DELETE FROM phones WHERE contact_name = ?", (name,))
+        self.connection.executemany(
+            "INSERT INTO phones VALUES (?, ?, ?)",
+            ((name, position, p.value) for position, p in enumerate(contact.phones)),
+        )
+
+    def pop_changes(self) -> set[str]:
+        # every change is written to the database right away
+        return set()
+
+    def get_birthdays_per_week(self, days_delta=7):
+        if len(self) == 0:
+            return "No users found."
+
+        current_date = datetime.now().date()
+        return format_birthdays(
+            self.__get_birthdays(current_date, days_delta), days_delta
+        )
+
+    def get_upcoming_birthdays(
+        self, reference_dates: list[date], days_delta: int
+    ) -> list[dict[date, list[str]]]:
+        # the database looks birthdays up by the index, one query per date
+        return [
+            self.__get_birthdays(reference_date, days_delta)
+            for reference_date in reference_dates
+        ]
+
+    def __get_birthdays(self, current_date: date, days_delta: int) -> dict:
+        upcoming_days = {
+            f"{month:02d}-{day:02d}": upcoming_date
+            for (month, day), upcoming_date in get_upcoming_days(
+                current_date, days_delta
+            ).items()
+        }
+
+        if len(upcoming_days) == 0:
+            return {}
+
+        placeholders = ", ".join("?" * len(upcoming_days))
+        cursor = self.connection.execute(
+            f"""
+            SELECT name, birthday_month_day FROM contacts
+            WHERE birthday_month_day IN ({placeholders}) ORDER BY name
+            """,
+            tuple(upcoming_days),
+        )
+
+        birthdays_list = {}
+        for name, month_day in cursor:
+            birthdays_list.setdefault(upcoming_days[month_day], []).append(name)
+        return birthdays_list
+
+    def filter(self, search_criteria: str) -> list[Contact]:
+        return list(
+            self.__select(
+                """
+                WHERE instr(name, :criteria) OR instr(birthday, :criteria)
+                    OR instr(email, :criteria) OR instr(address, :criteria)
+                    OR EXISTS (
+                        SELECT 1 FROM phones
+                        WHERE contact_name = name AND instr(value, :criteria)
+                    )
+                ORDER BY name
+                """,
+                {"criteria": search_criteria},
+            )
+        )
+
+    def __get_row(self, contact: Contact) -> tuple:
+        birthday = contact.birthday.value if contact.birthday else None
+        return (
+            contact.name.value,
+            str(contact.birthday) if birthday else None,
+            birthday.strftime("%m-%d") if birthday else None,
+            contact.email.value if contact.email else None,
+            contact.address.value if contact.address else None,
+        )
+
+    def __select(self, condition: str, parameters=()):
+        cursor = self.connection.execute(f"{CONTACT_SELECT} {condition}", parameters)
+        for name, birthday, email, address, phones in cursor:
+            contact = Contact(name)
+            if phones:
+                contact.phones = tuple(
+                    Phone(phone) for phone in phones.split(SEPARATOR)
+                )
+            if birthday:
+                contact.birthday = Birthday(birthday)
+            if email:
+                contact.email = Email(email)
+            if address:
+                contact.address = Address(address)
+            contact.book = self
+            yield contact
+
+
+class SqliteNoteBook(NoteBook):
+    """Notebook which keeps notes in the SQLite database"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        super().__init__()
+        self.connection = connection
+        self.__similar_titles = SimilarKeys(
+            connection, "notes", "title", "title_deletions"
+        )
+
+    def __str__(self):
+        if len(self) == 0:
+            return "Notebook is empty."
+
+        return "\n".join(str(note) for note in self.values())
+
+    def __len__(self):
+        return self.connection.execute("SELECT count(*) FROM notes").fetchone()[0]
+
+    def __iter__(self):
+        cursor = self.connection.execute("SELECT title FROM notes ORDER BY title")
+        return (title for title, in cursor)
+
+    def __contains__(self, title):
+        cursor = self.connection.execute(
+            "SELECT 1 FROM notes WHERE title = ?", (title,)
+        )
+        return cursor.fetchone() is not None
+
+    def __getitem__(self, title):
+        note = self.find_by_title(title)
+        if note is None:
+            raise KeyError(title)
+        return note
+
+    def values(self):
+        return self.__select("ORDER BY title")
+
+    def values_by_title(self, offset: int = 0):
+        return self.__select("ORDER BY title LIMIT -1 OFFSET ?", (offset,))
+
+    def add_record(self, note: Note):
+        self.delete(note.title)
+        self.connection.execute(
+            "INSERT INTO notes VALUES (?, ?)", (note.title, note.content)
+        )
+        self.__insert_tags(note.title, note.tags)
+        self.__similar_titles.add(note.title)
+
+    def find_by_title(self, title: str) -> Note:
+        return next(self.__select("WHERE title = ?", (title,)), None)
+
+    def get_similar_titles(
+        self, title: str, max_distance: int = 2, limit: int = 5
+    ) -> list[str]:
+        similar = self.__similar_titles.search(title, max_distance)
+        return [title for _, title in similar][:limit]
+
+    def delete(self, title: str):
+        self.connection.execute("DELETE FROM notes WHERE title = ?", (title,))
+
+    def change(
+        self,
+        current_title: str,
+        title: str | None,
+        content: str | None,
+        tags: list[str] | None,
+    ):
+        note = self.find_by_title(current_title)
+        if note:
+            if title:
+                note.title = title
+            if content:
+                note.content = content
+            if tags:
+                note.tags = tags
+
+            self.delete(current_title)
+            self.add_record(note)
+
+    def pop_changes(self) -> set[str]:
+        return set()
+
+    def search(self, criteria: str) -> list[Note]:
+        return list(
+            self.__select(
+                "WHERE instr(title, :criteria) OR instr(content, :criteria) ORDER BY title",
+                {"criteria": criteria},
+            )
+        )
+
+    def search_by_tags(self, tags: list[str], match_all: bool = False) -> list[Note]:
+        tags = set(tags)
+        placeholders = ", ".join("?" * len(tags))
+        having = f"HAVING count(DISTINCT tag) = {len(tags)}" if match_all else ""
+        return list(
+            self.__select(
+                f"""
+                WHERE title IN (
+                    SELECT note_title FROM tags WHERE tag IN ({placeholders})
+                    GROUP BY note_title {having}
+                )
+                ORDER BY title
+                """,
+                tuple(tags),
+            )
+        )
+
+    def get_tag_counts(self) -> dict[str, int]:
+        cursor = self.connection.execute(
+            "SELECT tag, count(DISTINCT note_title) FROM tags GROUP BY tag"
+        )
+        return dict(cursor.fetchall())
+
+    def __insert_tags(self, title: str, tags: list[str]):
+        self.connection.executemany(
+            "INSERT INTO tags VALUES (?, ?, ?)",
+            ((title, position, tag) for position, tag in enumerate(tags)),
+        )
+
+    def __select(self, condition: str, parameters=()):
+        cursor = self.connection.execute(f"{NOTE_SELECT} {condition}", parameters)
+        for title, content, tags in cursor:
+            yield Note(title, content, tags.split(SEPARATOR) if tags else [])
+
+
+class SqliteAssistant(Assistant):
+    """Assistant which keeps both books in the SQLite database.
+
+    Nothing is loaded into memory at startup, every book operation is
+    executed as a query and `save` commits the pending transaction.
+    """
+
+    def __init__(self):
+        self.__connect(":memory:")
+
+    @property
+    def contact_book(self) -> ContactBook:
+        return self.__contact_book
+
+    @property
+    def note_book(self) -> NoteBook:
+        return self.__note_book
+
+    def save(self, filename):
+        self.__connection.commit()
+
+    def load(self, filename):
+        self.close()
+        path = get_data_path(filename)
+        path.parent.mkdir(exist_ok=True)
+        self.__connect(path)
+
+    def close(self):
+        self.__connection.commit()
+        self.__connection.close()
+
+    def __connect(self, database):
+        # the server executes commands in a thread other than the loading one
+        self.__connection = sqlite3.connect(database, check_same_thread=False)
+        self.__connection.execute("PRAGMA foreign_keys = ON")
+        self.__connection.executescript(SCHEMA)
+        self.__contact_book = SqliteContactBook(self.__connection)
+        self.__note_book = SqliteNoteBook(self.__connection)
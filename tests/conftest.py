@@ -0,0 +1,46 @@
+import pytest
+
+from neoassistant.assistant import Neoassistant
+
+
+@pytest.fixture(autouse=True)
+def data_directory(tmp_path, monkeypatch):
+    """Keep the data files of every test in a directory of its own"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / ".neoassistant-data"
+
+
+@pytest.fixture(name="data_filename")
+def fixture_data_filename() -> str:
+    return "data.bin"
+
+
+@pytest.fixture(name="load")
+def fixture_load(data_filename):
+    """Return a function loading an assistant from the data file of the test"""
+
+    def load(compression: str = None) -> Neoassistant:
+        assistant = Neoassistant(compression)
+        assistant.load(data_filename)
+        return assistant
+
+    return load
+
+
+@pytest.fixture(name="get_names")
+def fixture_get_names(load):
+    """Return a function listing the contact names of the assistant.
+
+    Without an assistant the names are read from a freshly loaded one.
+    """
+
+    def get_names(assistant: Neoassistant = None) -> list[str]:
+        if assistant is not None:
+            return sorted(assistant.contact_book.data)
+
+        assistant = load()
+        names = sorted(assistant.contact_book.data)
+        assistant.close()
+        return names
+
+    return get_names
@@ -0,0 +1,52 @@
+import pytest
+
+from neoassistant.batch import run_script
+
+
+@pytest.fixture(name="run")
+def fixture_run(load, data_filename):
+    """Return a function running the script lines, which returns the failed count"""
+
+    def run(lines: list[str]) -> int:
+        assistant = load()
+        try:
+            return run_script(
+                assistant, data_filename, lines, output="plain", continue_on_error=True
+            )
+        finally:
+            assistant.close()
+
+    return run
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "add -n Ann",
+        "change -cn Anne -n Bob",
+        "delete -n Anne",
+        "show -n Anne",
+        "find-by-phone -p 0123456789",
+        "find-by-email -e bob@example.com",
+        "add-note -t Shopping -c Bread",
+        "change-note -ct Shop -t Food",
+        "delete-note -t Shop",
+        "show-note -t Shop",
+    ],
+)
+def test_missing_and_existing_records_fail(line, run, capsys):
+    run(["add -n Ann", "add-note -t Shopping -c Milk"])
+    capsys.readouterr()
+
+    assert run([line]) == 1
+    assert capsys.readouterr().err.startswith("Line 1: ")
+
+
+def test_empty_searches_do_not_fail(run, capsys):
+    lines = [
+        "filter -cr Bob",
+        "filter-notes -cr Bread",
+        "filter-notes-by-tags --tags home",
+    ]
+    assert run(lines) == 0
+    assert capsys.readouterr().err == ""
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from random import Random
+
+import pytest
+
+from neoassistant import contact_book as contact_book_module
+from neoassistant.contact_book import Contact, ContactBook
+
+
+pytest.importorskip("numpy")
+
+# Every day of two years, a leap one and a common one, and the turn of both
+REFERENCE_DATES = [date(2023, 12, 1) + timedelta(days=i) for i in range(800)]
+
+DAYS_DELTAS = [1, 7, 60, 366]
+
+
+def generate_contact_book(random: Random) -> ContactBook:
+    book = ContactBook()
+    for i in range(400):
+        contact = Contact(f"Name {i}")
+        if random.random() < 0.9:
+            birthday = date(2000, 1, 1) + timedelta(days=random.randrange(366))
+            contact.set_birthday(birthday.strftime("%d.%m.%Y"))
+        book.add(contact)
+    # the people born on the 29th of February celebrate on the 28th in common years
+    for i in range(3):
+        contact = Contact(f"Leap {i}")
+        contact.set_birthday("29.02.2000")
+        book.add(contact)
+    return book
+
+
+def get_upcoming_birthdays(book: ContactBook, days_delta: int, use_engine: bool):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        if use_engine:
+            monkeypatch.setattr(contact_book_module, "ENGINE_MIN_CONTACTS", 0)
+            monkeypatch.setattr(contact_book_module, "ENGINE_MIN_DAYS", 0)
+        else:
+            monkeypatch.setattr(contact_book_module, "get_numpy", lambda: None)
+        return book.get_upcoming_birthdays(REFERENCE_DATES, days_delta)
+
+
+@pytest.mark.parametrize("days_delta", DAYS_DELTAS)
+def test_engine_matches_the_birthday_index(days_delta):
+    book = generate_contact_book(Random(days_delta))
+
+    expected = get_upcoming_birthdays(book, days_delta, use_engine=False)
+    assert get_upcoming_birthdays(book, days_delta, use_engine=True) == expected
+
+
+def test_engine_follows_the_changes():
+    book = generate_contact_book(Random(0))
+    get_upcoming_birthdays(book, 60, use_engine=True)
+
+    book.delete("Name 1")
+    book.find("Name 2").set_birthday("29.02.1996")
+    contact = Contact("New")
+    contact.set_birthday("01.01.1990")
+    book.add(contact)
+
+    expected = get_upcoming_birthdays(book, 60, use_engine=False)
+    assert get_upcoming_birthdays(book, 60, use_engine=True) == expected
@@ -0,0 +1,84 @@
+from random import Random
+
+import pytest
+
+from neoassistant.content_scanner import content_scanner
+from neoassistant.note_book import Note
+
+
+COMPRESSIONS = [None, "zlib", "lzma"]
+
+# Non-ASCII words are matched by their UTF-8 bytes in the snapshot
+WORDS = ["milk", "bread", "butter", "молоко", "хліб", "tea", "rice", "salt"]
+
+
+@pytest.fixture(name="parallel_scanner", autouse=True)
+def fixture_parallel_scanner(monkeypatch):
+    """Check every search in two worker processes"""
+    monkeypatch.setattr(content_scanner, "workers", 2)
+    monkeypatch.setattr(content_scanner, "threshold", 1)
+    yield content_scanner
+    content_scanner.close()
+
+
+def generate_content(random: Random) -> str:
+    # long contents are compressed, short ones are stored as they are
+    count = random.choice([1, 3, 100])
+    return " ".join(random.choices(WORDS, k=count))
+
+
+def get_criteria(random: Random) -> list[str]:
+    criteria = WORDS + ["milk bread", "note 1", "хліб молоко", "absent"]
+    return criteria + [f"{random.choice(WORDS)} {random.choice(WORDS)}"]
+
+
+def assert_search_matches_brute_force(assistant, random: Random):
+    notes = sorted(assistant.note_book.values(), key=lambda note: note.title)
+    for criteria in get_criteria(random):
+        expected = [note for note in notes if note.matches(criteria)]
+        assert assistant.note_book.search(criteria) == expected
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_parallel_search_matches_brute_force(compression, load, data_filename):
+    random = Random(0)
+    assistant = load(compression)
+    for i in range(300):
+        assistant.note_book.add_record(Note(f"note {i}", generate_content(random), []))
+    assistant.compact(data_filename)
+    assistant.close()
+
+    assistant = load(compression)
+    assert_search_matches_brute_force(assistant, random)
+
+    # notes changed since the plan was built are matched in this process
+    for i in range(0, 300, 7):
+        assistant.note_book.change(f"note {i}", None, generate_content(random), None)
+    for i in range(300, 310):
+        assistant.note_book.add_record(Note(f"note {i}", generate_content(random), []))
+    assistant.note_book.delete("note 1")
+    assert_search_matches_brute_force(assistant, random)
+
+    # and the plan of the new snapshot replaces the old one
+    assistant.compact(data_filename)
+    assert_search_matches_brute_force(assistant, random)
+    assistant.close()
+
+
+def test_snapshot_replaced_by_another_process_is_scanned_here(load, data_filename):
+    random = Random(1)
+    assistant = load("zlib")
+    for i in range(100):
+        assistant.note_book.add_record(Note(f"note {i}", generate_content(random), []))
+    assistant.compact(data_filename)
+    assistant.close()
+
+    first, second = load("zlib"), load("zlib")
+    second.note_book.delete("note 2")
+    second.save(data_filename)
+    second.compact(data_filename)
+    second.close()
+
+    # the workers map the new snapshot, while the first instance reads the old one
+    assert_search_matches_brute_force(first, random)
+    first.close()
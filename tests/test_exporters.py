@@ -0,0 +1,101 @@
+import csv
+import json
+from random import Random
+
+import pytest
+
+from neoassistant.contact_book import Contact, ContactBook
+from neoassistant.exporters import export_contacts, export_notes
+from neoassistant.note_book import Note, NoteBook
+
+
+TAGS = ["home", "work", "todo"]
+
+# Texts quoted in CSV or escaped in JSON
+TEXTS = ["Milk", "Milk, bread", 'The "best" one', "Line\nbreak", "Київ", ""]
+
+
+def generate_contact_book(random: Random) -> ContactBook:
+    book = ContactBook()
+    for i in random.sample(range(100), 100):
+        contact = Contact(f"Name {i:02d}")
+        for _ in range(random.randint(0, 2)):
+            contact.set_phone(f"{random.randrange(10**10):010d}")
+        if random.random() < 0.5:
+            contact.set_birthday(f"{random.randint(1, 28):02d}.03.1990")
+        if random.random() < 0.5:
+            contact.set_email(f"name{i}@example.com")
+        if text := random.choice(TEXTS):
+            contact.set_address(text)
+        book.add(contact)
+    return book
+
+
+def generate_note_book(random: Random) -> NoteBook:
+    book = NoteBook()
+    for i in random.sample(range(100), 100):
+        tags = random.sample(TAGS, random.randint(0, 2))
+        book.add_record(Note(f"Note {i:02d}", random.choice(TEXTS), tags))
+    return book
+
+
+def read_rows(path: str) -> list[dict]:
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in file]
+        return list(csv.DictReader(file))
+
+
+def get_contact_row(contact: Contact, file_format: str) -> dict:
+    row = {
+        "name": contact.name.value,
+        "phones": [phone.value for phone in contact.phones],
+        "birthday": str(contact.birthday) if contact.birthday else None,
+        "email": contact.email.value if contact.email else None,
+        "address": contact.address.value if contact.address else None,
+    }
+    if file_format == "csv":
+        # CSV has neither lists nor nulls
+        row["phones"] = ";".join(row["phones"])
+        row = {key: value or "" for key, value in row.items()}
+    return row
+
+
+def get_note_row(note: Note, file_format: str) -> dict:
+    tags = list(note.tags)
+    if file_format == "csv":
+        tags = ";".join(tags)
+    return {"title": note.title, "content": note.content, "tags": tags}
+
+
+@pytest.mark.parametrize("file_format", ["csv", "jsonl"])
+@pytest.mark.parametrize("criteria", [None, "Name 1", "Milk"])
+def test_exported_contacts_match_the_book(file_format, criteria):
+    book = generate_contact_book(Random(0))
+    path = f"contacts.{file_format}"
+
+    count = export_contacts(book, path, criteria=criteria)
+
+    contacts = sorted(book.data.values(), key=lambda contact: contact.name.value)
+    if criteria:
+        contacts = [contact for contact in contacts if contact.matches(criteria)]
+    assert count == len(contacts)
+    assert read_rows(path) == [get_contact_row(c, file_format) for c in contacts]
+
+
+@pytest.mark.parametrize("file_format", ["csv", "jsonl"])
+@pytest.mark.parametrize(
+    "tags, match_all", [(None, False), (TAGS[:2], False), (TAGS[:2], True)]
+)
+def test_exported_notes_match_the_book(file_format, tags, match_all):
+    book = generate_note_book(Random(0))
+    path = f"notes.{file_format}"
+
+    count = export_notes(book, path, tags=tags, match_all=match_all)
+
+    notes = sorted(book.data.values(), key=lambda note: note.title)
+    if tags:
+        match = all if match_all else any
+        notes = [note for note in notes if match(tag in note.tags for tag in tags)]
+    assert count == len(notes)
+    assert read_rows(path) == [get_note_row(note, file_format) for note in notes]
@@ -0,0 +1,149 @@
+from datetime import date, timedelta
+from random import Random
+
+import pytest
+
+from neoassistant.contact_book import Contact, ContactBook
+from neoassistant.exporters import contact_to_row, export_contacts
+from neoassistant.importers import (
+    MAX_ERROR_MESSAGES,
+    decode_lines,
+    import_contacts,
+    import_contacts_from_file,
+    read_csv_rows,
+)
+
+
+# Values quoted in CSV or continued on the next lines of vCard
+ADDRESSES = ["Kyiv", "Lviv, Franka 1", 'The "Flat" 2', "Київ, Хрещатик 3", "x" * 100]
+
+
+def generate_contacts(random: Random, count: int) -> list[Contact]:
+    contacts = []
+    for i in range(count):
+        contact = Contact(f"Name {i}")
+        for _ in range(random.randint(0, 3)):
+            contact.set_phone(f"{random.randrange(10**10):010d}")
+        if random.random() < 0.7:
+            birthday = date(1950, 1, 1) + timedelta(days=random.randrange(25000))
+            contact.set_birthday(birthday.strftime("%d.%m.%Y"))
+        if random.random() < 0.7:
+            contact.set_email(f"name.{i}@example.com")
+        if random.random() < 0.7:
+            contact.set_address(random.choice(ADDRESSES))
+        contacts.append(contact)
+    return contacts
+
+
+def fold(line: str, width: int = 40) -> list[str]:
+    """Split the vCard line into lines continued with a leading space"""
+    return [line[:width]] + [
+        f" {line[i : i + width]}" for i in range(width, len(line), width)
+    ]
+
+
+def write_vcard(path: str, contacts: list[Contact]):
+    """Write the contacts the way address books do: folded lines, formatted phones"""
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        for contact in contacts:
+            lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{contact.name.value}"]
+            for phone in contact.phones:
+                phone = phone.value
+                lines.append(f"TEL;TYPE=cell:({phone[:3]}) {phone[3:6]}-{phone[6:]}")
+            if contact.birthday:
+                lines.append(f"BDAY:{contact.birthday.value.isoformat()}")
+            if contact.email:
+                lines.append(f"item1.EMAIL;TYPE=INTERNET:{contact.email.value}")
+            if contact.address:
+                lines.extend(fold(f"ADR;TYPE=home:;;{contact.address.value};;;;"))
+            lines.append("END:VCARD")
+            file.write("\r\n".join(lines) + "\r\n")
+
+
+def get_rows(contacts) -> list[dict]:
+    return sorted(
+        (contact_to_row(contact) for contact in contacts), key=lambda row: row["name"]
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("file_format", ["csv", "vcard"])
+def test_imported_contacts_match_the_file(seed, file_format):
+    contacts = generate_contacts(Random(seed), 300)
+    if file_format == "csv":
+        path = "contacts.csv"
+        book = ContactBook()
+        book.add_many(contacts)
+        export_contacts(book, path)
+    else:
+        path = "contacts.vcf"
+        write_vcard(path, contacts)
+
+    book = ContactBook()
+    result = import_contacts_from_file(book, path)
+
+    assert result.imported_count == len(contacts)
+    assert result.failed_count == 0
+    assert get_rows(book.values()) == get_rows(contacts)
+    # the imported contacts are indexed like the added ones
+    for contact in contacts:
+        name = contact.name.value
+        for phone in contact.phones:
+            assert name in [c.name.value for c in book.find_by_phone(phone.value)]
+        if contact.email:
+            assert name in [
+                c.name.value for c in book.find_by_email(contact.email.value)
+            ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 10_000])
+def test_invalid_and_existing_rows_are_reported(batch_size):
+    book = ContactBook()
+    book.add(Contact("Ann"))
+    with open("contacts.csv", "w", encoding="utf-8", newline="") as file:
+        file.write(
+            "name,phones,birthday,email,address\n"
+            "Bob,0123456789;0987654321,01.02.2000,bob@example.com,Kyiv\n"
+            "Ann,,,,\n"
+            "Carol,123,,,\n"
+            "Dave,,31.02.2000,,\n"
+            "Bob,,,,\n"
+            ",,,,\n"
+            "Eve,,,eve@,\n"
+            "Frank,,,,Lviv\n"
+        )
+
+    with open("contacts.csv", "rb") as file:
+        result = import_contacts(
+            book, read_csv_rows(decode_lines(file)), batch_size=batch_size
+        )
+
+    assert result.imported_count == 2
+    assert sorted(book.data) == ["Ann", "Bob", "Frank"]
+    assert [error.split(":")[0] for error in result.errors] == [
+        f"Line {line_number}" for line_number in range(3, 9)
+    ]
+    assert [phone.value for phone in book.find("Bob").phones] == [
+        "0123456789",
+        "0987654321",
+    ]
+
+
+def test_undecodable_file_keeps_the_rows_before():
+    with open("contacts.csv", "wb") as file:
+        file.write(b"name,phones\nAnn,\nBob,\n\xff\xfe,\nCarol,\n")
+
+    book = ContactBook()
+    result = import_contacts_from_file(book, "contacts.csv")
+
+    assert sorted(book.data) == ["Ann", "Bob"]
+    assert result.stop_message.startswith("The file could not be read after line 3")
+
+
+def test_error_messages_are_limited():
+    rows = ((line_number, {"name": ""}) for line_number in range(1000))
+    result = import_contacts(ContactBook(), rows)
+
+    assert result.failed_count == 1000
+    assert len(result.errors) == MAX_ERROR_MESSAGES
+    assert str(result).endswith(f"... and {1000 - MAX_ERROR_MESSAGES} more.")
@@ -0,0 +1,291 @@
+from datetime import date, timedelta
+from random import Random
+
+import pytest
+
+from neoassistant.contact_book import Contact, ContactBook, get_upcoming_days
+from neoassistant.indexes import (
+    BKTree,
+    DeletionIndex,
+    NGramIndex,
+    PostingIndex,
+    SortedKeys,
+    levenshtein_distance,
+)
+from neoassistant.note_book import Note, NoteBook
+
+
+# A small alphabet, so that random texts share many n-grams
+ALPHABET = "abcde"
+
+SEEDS = range(5)
+
+
+def generate_text(random: Random, max_length: int = 12) -> str:
+    return "".join(random.choices(ALPHABET, k=random.randint(1, max_length)))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("n", [2, 3])
+def test_ngram_candidates_contain_every_match(seed, n):
+    random = Random(seed)
+    index = NGramIndex(n)
+    texts = {}
+    for key in range(200):
+        texts[key] = [generate_text(random) for _ in range(random.randint(1, 3))]
+        index.add(key, texts[key])
+    for key in random.sample(sorted(texts), 50):
+        index.remove(key, texts.pop(key))
+
+    for _ in range(200):
+        substring = generate_text(random, 5)
+        matches = {
+            key for key, values in texts.items() if any(substring in v for v in values)
+        }
+        assert matches <= index.get_candidates(substring)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_postings_match_brute_force(seed):
+    random = Random(seed)
+    index = PostingIndex()
+    values = {}
+    for key in range(200):
+        values[key] = set(random.sample(ALPHABET, random.randint(0, 3)))
+        index.add(key, values[key])
+    for key in random.sample(sorted(values), 50):
+        index.remove(key, values.pop(key))
+
+    for _ in range(50):
+        query = random.sample(ALPHABET, random.randint(1, 3))
+        assert index.get_any(query) == {
+            key for key, key_values in values.items() if key_values & set(query)
+        }
+        assert index.get_all(query) == {
+            key for key, key_values in values.items() if key_values >= set(query)
+        }
+
+    assert index.get_counts() == {
+        value: sum(value in key_values for key_values in values.values())
+        for value in ALPHABET
+        if any(value in key_values for key_values in values.values())
+    }
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sorted_keys_match_brute_force(seed, monkeypatch):
+    # small blocks, so that they are split and emptied
+    monkeypatch.setattr(SortedKeys, "BLOCK_SIZE", 4)
+    random = Random(seed)
+    expected = {generate_text(random, 4) for _ in range(30)}
+    keys = SortedKeys(expected)
+
+    for _ in range(500):
+        key = generate_text(random, 3)
+        if random.random() < 0.6:
+            keys.add(key)
+            expected.add(key)
+        else:
+            keys.remove(key)
+            expected.discard(key)
+
+        assert len(keys) == len(expected)
+        assert (key in keys) == (key in expected)
+
+    ordered = sorted(expected)
+    assert list(keys) == ordered
+    assert all(len(block) <= 2 * SortedKeys.BLOCK_SIZE for block in keys.blocks)
+    for start in range(len(ordered) + 2):
+        assert list(keys.iterate(start)) == ordered[start:]
+
+    for size in [0, 1, len(ordered) // 2, len(ordered)]:
+        subset = set(random.sample(ordered, size))
+        assert keys.get_ordered(subset) == sorted(subset)
+
+
+def generate_contact(random: Random, name: str) -> Contact:
+    contact = Contact(name)
+    for _ in range(random.randint(0, 2)):
+        contact.set_phone(f"{random.randint(0, 20):010d}")
+    if random.random() < 0.7:
+        birthday = date(2000, 1, 1) + timedelta(days=random.randint(0, 365))
+        contact.set_birthday(birthday.strftime("%d.%m.%Y"))
+    if random.random() < 0.7:
+        contact.set_email(f"{generate_text(random, 3)}@Example.com")
+    if random.random() < 0.5:
+        contact.set_address(generate_text(random))
+    return contact
+
+
+def generate_contact_book(random: Random) -> ContactBook:
+    """Generate a contact book changed in every way the indexes follow"""
+    book = ContactBook()
+    for i in range(150):
+        book.add(generate_contact(random, f"{generate_text(random, 4)}{i}"))
+
+    names = sorted(book.data)
+    for name in random.sample(names, 30):
+        book.delete(name)
+    for name in random.sample(sorted(book.data), 30):
+        contact = book.find(name)
+        contact.clear_phones()
+        contact.set_phone(f"{random.randint(0, 20):010d}")
+        contact.set_email(f"{generate_text(random, 3)}@example.com")
+    # replacing a contact with a new one of the same name
+    for name in random.sample(sorted(book.data), 10):
+        book.add(generate_contact(random, name))
+    return book
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_contact_lookups_match_brute_force(seed):
+    random = Random(seed)
+    book = generate_contact_book(random)
+    contacts = [book.data[name] for name in sorted(book.data)]
+
+    assert list(book.values_by_name()) == contacts
+    assert list(book.values_by_name(7)) == contacts[7:]
+
+    for _ in range(50):
+        criteria = generate_text(random, 3)
+        assert book.filter(criteria) == [c for c in contacts if c.matches(criteria)]
+
+    for number in range(21):
+        phone = f"{number:010d}"
+        assert book.find_by_phone(phone) == [
+            c for c in contacts if phone in [p.value for p in c.phones]
+        ]
+
+    for email in {c.email.value for c in contacts if c.email}:
+        assert book.find_by_email(email.upper()) == [
+            c for c in contacts if c.email and c.email.value.lower() == email.lower()
+        ]
+
+    # the filter index built by the searches above follows later changes too
+    contact = contacts[0]
+    book.delete(contact.name.value)
+    contact.set_address("edcba edcba")
+    book.add(contact)
+    assert book.filter("edcba edcba") == [contact]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_birthdays_match_brute_force(seed):
+    random = Random(seed)
+    book = generate_contact_book(random)
+    reference_dates = [
+        date(2023, 2, 27),
+        date(2023, 12, 30),
+        date(2024, 2, 28),
+        date(2024, 12, 31),
+    ]
+
+    for days_delta in [1, 7, 45, 366]:
+        upcoming = book.get_upcoming_birthdays(reference_dates, days_delta)
+        for reference_date, birthdays in zip(reference_dates, upcoming):
+            expected = {}
+            upcoming_days = get_upcoming_days(reference_date, days_delta)
+            for contact in sorted(book.data.values(), key=lambda c: c.name.value):
+                if not contact.birthday:
+                    continue
+                birthday = contact.birthday.value
+                day = upcoming_days.get((birthday.month, birthday.day))
+                if day is not None:
+                    expected.setdefault(day, []).append(contact.name.value)
+            assert birthdays == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_note_lookups_match_brute_force(seed):
+    random = Random(seed)
+    book = NoteBook()
+    for i in range(150):
+        tags = random.sample(ALPHABET, random.randint(0, 3))
+        book.add_record(
+            Note(f"{generate_text(random, 4)}{i}", generate_text(random), tags)
+        )
+    for title in random.sample(sorted(book.data), 30):
+        book.delete(title)
+    for title in random.sample(sorted(book.data), 30):
+        tags = random.sample(ALPHABET, random.randint(1, 2))
+        new_title = random.choice([None, f"{title}{generate_text(random, 2)}"])
+        book.change(title, new_title, generate_text(random), tags)
+
+    notes = [book.data[title] for title in sorted(book.data)]
+    assert list(book.values_by_title()) == notes
+
+    for _ in range(50):
+        criteria = generate_text(random, 3)
+        assert book.search(criteria) == [n for n in notes if n.matches(criteria)]
+
+    for _ in range(20):
+        tags = random.sample(ALPHABET, random.randint(1, 3))
+        assert book.search_by_tags(tags) == [
+            n for n in notes if set(n.tags) & set(tags)
+        ]
+        assert book.search_by_tags(tags, match_all=True) == [
+            n for n in notes if set(n.tags) >= set(tags)
+        ]
+
+    assert book.get_tag_counts() == {
+        tag: count
+        for tag in ALPHABET
+        if (count := sum(tag in n.tags for n in notes)) > 0
+    }
+
+
+def get_distance(s1: str, s2: str) -> int:
+    """Edit distance computed with the whole dynamic programming matrix"""
+    row = list(range(len(s2) + 1))
+    for i, char1 in enumerate(s1, start=1):
+        previous, row[0] = row[0], i
+        for j, char2 in enumerate(s2, start=1):
+            previous, row[j] = row[j], min(
+                row[j] + 1, row[j - 1] + 1, previous + (char1 != char2)
+            )
+    return row[-1]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_levenshtein_distance_matches_brute_force(seed):
+    random = Random(seed)
+    for _ in range(500):
+        # long strings need more than one machine word of bits
+        max_length = random.choice([4, 12, 80])
+        s1 = generate_text(random, max_length)
+        s2 = random.choice([generate_text(random, max_length), s1[::-1], s1[1:]])
+        distance = get_distance(s1, s2)
+
+        assert levenshtein_distance(s1, s2) == distance
+        assert levenshtein_distance("", s2) == len(s2)
+        for max_distance in range(4):
+            assert levenshtein_distance(s1, s2, max_distance) == min(
+                distance, max_distance + 1
+            )
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_similar_keys_match_brute_force(seed):
+    random = Random(seed)
+    # keys longer than the indexed prefixes as well
+    keys = {generate_text(random, 10) for _ in range(300)}
+    deletion_index = DeletionIndex(keys)
+    for key in random.sample(sorted(keys), 50):
+        deletion_index.remove(key)
+        keys.remove(key)
+    bk_tree = BKTree(keys)
+    assert len(deletion_index) == len(bk_tree) == len(keys)
+
+    for _ in range(100):
+        query = generate_text(random, 10)
+        if random.random() < 0.5:
+            # a misspelled key
+            query = random.choice(sorted(keys))
+            position = random.randint(0, len(query))
+            query = query[:position] + random.choice(ALPHABET) + query[position + 1 :]
+
+        distances = sorted((get_distance(query, key), key) for key in keys)
+        for max_distance in range(3):
+            expected = [pair for pair in distances if pair[0] <= max_distance]
+            assert deletion_index.search(query, max_distance) == expected
+            assert bk_tree.search(query, max_distance) == expected
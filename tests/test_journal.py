@@ -0,0 +1,149 @@
+import copyreg
+import pickle
+from datetime import date
+
+import pytest
+
+from neoassistant.assistant import Neoassistant, get_data_path
+from neoassistant.contact_book import Contact, ContactBook
+from neoassistant.fields import Field
+from neoassistant.journal import RECORD_HEADER
+from neoassistant.note_book import Note, NoteBook
+
+
+@pytest.fixture(name="save_contact")
+def fixture_save_contact(load, data_filename):
+    """Return a function saving the contact in a session of its own.
+
+    So every contact is a record of its own in the journal.
+    """
+
+    def save_contact(name: str):
+        assistant = load()
+        assistant.contact_book.add(Contact(name))
+        assistant.save(data_filename)
+        assistant.close()
+
+    return save_contact
+
+
+@pytest.fixture(name="journal_path")
+def fixture_journal_path(data_directory, data_filename):
+    return data_directory / f"{data_filename}.journal"
+
+
+class BaselinePickler(pickle.Pickler):
+    """Pickles the assistant the way it was saved before the journal.
+
+    Every object was pickled with its instance dictionary, fields kept their
+    values in name-mangled attributes of their classes.
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, Neoassistant):
+            state = {
+                "_Neoassistant__contact_book": obj.contact_book,
+                "_Neoassistant__note_book": obj.note_book,
+            }
+        elif isinstance(obj, (ContactBook, NoteBook)):
+            state = {"data": dict(obj.data)}
+        elif isinstance(obj, Contact):
+            state = {
+                "name": obj.name,
+                "birthday": obj.birthday,
+                "phones": list(obj.phones),
+                "address": obj.address,
+                "email": obj.email,
+            }
+        elif isinstance(obj, Note):
+            state = {"title": obj.title, "content": obj.content, "tags": list(obj.tags)}
+        elif isinstance(obj, Field):
+            state = {f"_{type(obj).__name__}__value": obj.value}
+        else:
+            return NotImplemented
+        return copyreg.__newobj__, (type(obj),), state
+
+
+def test_changes_are_appended_to_the_journal(save_contact, get_names, data_filename):
+    save_contact("Ann")
+    save_contact("Bob")
+
+    assert not get_data_path(data_filename).exists()
+    assert get_names() == ["Ann", "Bob"]
+
+
+def test_torn_tail_is_dropped(save_contact, get_names, journal_path):
+    save_contact("Ann")
+    save_contact("Bob")
+    with open(journal_path, "r+b") as file:
+        file.truncate(journal_path.stat().st_size - 3)
+
+    assert get_names() == ["Ann"]
+
+    # records saved later follow the last complete one
+    save_contact("Carol")
+    assert get_names() == ["Ann", "Carol"]
+
+
+def test_torn_header_is_dropped(save_contact, get_names, journal_path):
+    save_contact("Ann")
+    with open(journal_path, "ab") as file:
+        file.write(RECORD_HEADER.pack(100, 0)[:5])
+
+    assert get_names() == ["Ann"]
+
+    save_contact("Bob")
+    assert get_names() == ["Ann", "Bob"]
+
+
+def test_corrupt_tail_is_dropped(save_contact, get_names, journal_path):
+    save_contact("Ann")
+    size = journal_path.stat().st_size
+    save_contact("Bob")
+    with open(journal_path, "r+b") as file:
+        file.seek(size + RECORD_HEADER.size + 1)
+        byte = file.read(1)
+        file.seek(-1, 1)
+        file.write(bytes([byte[0] ^ 0xFF]))
+
+    assert get_names() == ["Ann"]
+    assert journal_path.stat().st_size == size
+
+    save_contact("Carol")
+    assert get_names() == ["Ann", "Carol"]
+
+
+@pytest.mark.parametrize("protocol", [4, pickle.HIGHEST_PROTOCOL])
+def test_baseline_pickle_is_loaded(protocol, load, get_names, data_filename):
+    assistant = Neoassistant()
+    contact = Contact("Ann")
+    contact.set_phone("0123456789")
+    contact.set_birthday("29.02.2000")
+    contact.set_email("ann@example.com")
+    contact.set_address("Kyiv")
+    assistant.contact_book.add(contact)
+    assistant.note_book.add_record(Note("Shopping", "Milk and bread", ["home"]))
+
+    path = get_data_path(data_filename)
+    path.parent.mkdir()
+    with open(path, "wb") as file:
+        BaselinePickler(file, protocol=protocol).dump(assistant)
+
+    assistant = load()
+    contact = assistant.contact_book.find("Ann")
+    assert [phone.value for phone in contact.phones] == ["0123456789"]
+    assert contact.birthday.value == date(2000, 2, 29)
+    assert contact.email.value == "ann@example.com"
+    assert contact.address.value == "Kyiv"
+    assert assistant.contact_book.find_by_phone("0123456789") == [contact]
+
+    note = assistant.note_book.find_by_title("Shopping")
+    assert note.content == "Milk and bread"
+    assert note.tags == ("home",)
+    assert assistant.note_book.search("bread") == [note]
+
+    # changes are journaled on top of the baseline pickle
+    assistant.contact_book.add(Contact("Bob"))
+    assistant.save(data_filename)
+    assistant.close()
+    assert get_names() == ["Ann", "Bob"]
@@ -0,0 +1,126 @@
+import pytest
+
+from neoassistant.assistant import Neoassistant
+from neoassistant.contact_book import Contact
+from neoassistant.note_book import Note
+
+
+LONG_CONTENT = "Milk, bread and butter. " * 20
+
+
+@pytest.fixture(name="load")
+def fixture_load(load):
+    """Compress the snapshots, so that the merges read compressed contents"""
+    return lambda: load("zlib")
+
+
+def add_contact(assistant: Neoassistant, name: str, phone: str = None):
+    contact = Contact(name)
+    if phone:
+        contact.set_phone(phone)
+    assistant.contact_book.add(contact)
+
+
+def get_phones(assistant: Neoassistant, name: str) -> list[str]:
+    return [phone.value for phone in assistant.contact_book.find(name).phones]
+
+
+def test_different_keys_are_merged(load, get_names, data_filename):
+    first, second = load(), load()
+
+    add_contact(first, "Ann")
+    first.save(data_filename)
+    add_contact(second, "Bob")
+    second.save(data_filename)
+
+    # the later save catches up with the earlier one
+    assert get_names(second) == ["Ann", "Bob"]
+    first.save(data_filename)
+    assert get_names(first) == ["Ann", "Bob"]
+    first.close()
+    second.close()
+
+    assert get_names() == ["Ann", "Bob"]
+
+
+def test_same_key_keeps_the_later_save(load, data_filename):
+    assistant = load()
+    add_contact(assistant, "Ann", "0000000000")
+    assistant.save(data_filename)
+    assistant.close()
+
+    first, second = load(), load()
+    first.contact_book.find("Ann").set_phone("1111111111")
+    second.contact_book.find("Ann").set_phone("2222222222")
+    first.save(data_filename)
+    second.save(data_filename)
+
+    assert get_phones(second, "Ann") == ["0000000000", "2222222222"]
+    # a record not changed since is replaced with the version saved by others
+    add_contact(first, "Bob")
+    first.save(data_filename)
+    assert get_phones(first, "Ann") == ["0000000000", "2222222222"]
+    first.close()
+    second.close()
+
+    assistant = load()
+    assert get_phones(assistant, "Ann") == ["0000000000", "2222222222"]
+    assistant.close()
+
+
+def test_deletions_are_merged(load, get_names, data_filename):
+    assistant = load()
+    add_contact(assistant, "Ann")
+    add_contact(assistant, "Bob")
+    assistant.save(data_filename)
+    assistant.close()
+
+    first, second = load(), load()
+    first.contact_book.delete("Ann")
+    first.save(data_filename)
+    add_contact(second, "Carol")
+    second.save(data_filename)
+
+    assert get_names(second) == ["Bob", "Carol"]
+    first.close()
+    second.close()
+    assert get_names() == ["Bob", "Carol"]
+
+
+def test_compaction_by_another_instance_is_merged(load, get_names, data_filename):
+    assistant = load()
+    add_contact(assistant, "Ann")
+    assistant.note_book.add_record(Note("Shopping", LONG_CONTENT, []))
+    assistant.compact(data_filename)
+    assistant.close()
+
+    first, second = load(), load()
+    add_contact(first, "Bob")
+    first.note_book.change("Shopping", None, LONG_CONTENT.upper(), None)
+    first.save(data_filename)
+    first.compact(data_filename)
+
+    # the second instance still reads contents of the snapshot replaced meanwhile
+    add_contact(second, "Carol")
+    second.note_book.add_record(Note("Todo", LONG_CONTENT, []))
+    second.save(data_filename)
+
+    assert get_names(second) == ["Ann", "Bob", "Carol"]
+    assert second.note_book.find_by_title("Shopping").content == LONG_CONTENT.upper()
+
+    # and compacts over the snapshot of the first one
+    second.compact(data_filename)
+    add_contact(first, "Dave")
+    first.save(data_filename)
+    assert get_names(first) == ["Ann", "Bob", "Carol", "Dave"]
+    assert first.note_book.find_by_title("Todo").content == LONG_CONTENT
+    first.close()
+    second.close()
+
+    assistant = load()
+    assert get_names(assistant) == ["Ann", "Bob", "Carol", "Dave"]
+    assert {note.title: note.content for note in assistant.note_book.values()} == {
+        "Shopping": LONG_CONTENT.upper(),
+        "Todo": LONG_CONTENT,
+    }
+    assistant.close()
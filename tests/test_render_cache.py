@@ -0,0 +1,147 @@
+import gc
+from collections import OrderedDict
+from contextlib import contextmanager
+from random import Random
+
+import pytest
+
+from neoassistant import contact_book, note_book
+from neoassistant.contact_book import Contact, ContactBook
+from neoassistant.note_book import Note, NoteBook
+from neoassistant.render_cache import RenderCache, render_cache
+
+
+@pytest.fixture(name="cache", autouse=True)
+def fixture_cache() -> RenderCache:
+    """Start every test with the empty cache"""
+    render_cache.clear()
+    yield render_cache
+    render_cache.clear()
+
+
+@contextmanager
+def uncached():
+    """Render the records without the cache, as they were rendered before it"""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # nothing fits into the cache of the zero size
+        for module in (contact_book, note_book):
+            monkeypatch.setattr(module, "render_cache", RenderCache(0))
+        yield
+
+
+def assert_rendered_as_uncached(records):
+    rendered = [str(record) for record in records]
+    with uncached():
+        assert rendered == [str(record) for record in records]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_changed_contacts_are_rendered_again(seed, cache):
+    random = Random(seed)
+    book = ContactBook()
+    for i in range(20):
+        book.add(Contact(f"Name {i}"))
+
+    changes = [
+        lambda contact: contact.set_phone(f"{random.randrange(10**10):010d}"),
+        lambda contact: contact.clear_phones(),
+        lambda contact: contact.set_birthday(f"{random.randint(1, 28):02d}.01.2000"),
+        lambda contact: contact.set_email(f"name{random.randint(0, 9)}@example.com"),
+        lambda contact: contact.set_address(f"Street {random.randint(0, 9)}"),
+    ]
+    for _ in range(200):
+        name = f"Name {random.randrange(20)}"
+        if random.random() < 0.1:
+            # a new contact of the same name replaces the old one
+            book.add(Contact(name))
+        else:
+            random.choice(changes)(book.find(name))
+        assert_rendered_as_uncached(book.values())
+
+    assert len(cache) == len(book)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_changed_notes_are_rendered_again(seed, cache):
+    random = Random(seed)
+    book = NoteBook()
+    for i in range(20):
+        book.add_record(Note(f"Title {i}", "Milk", []))
+
+    for _ in range(200):
+        title = random.choice(sorted(book.data))
+        kind = random.randrange(4)
+        if kind == 0:
+            book.change(title, f"Title {random.randrange(30)}", None, None)
+        elif kind == 1:
+            book.change(title, None, f"Content {random.randrange(10)}", None)
+        elif kind == 2:
+            book.change(title, None, None, random.sample(["home", "work"], 1))
+        else:
+            book.delete(title)
+            book.add_record(Note(f"Title {random.randrange(30)}", "Bread", ["todo"]))
+        assert_rendered_as_uncached(book.values())
+
+    assert len(cache) == len(book)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_least_recently_used_strings_are_evicted(seed):
+    random = Random(seed)
+    cache = RenderCache(max_size=100)
+    model = OrderedDict()
+    notes = [Note(f"Title {i}", "", []) for i in range(20)]
+
+    for _ in range(500):
+        note = random.choice(notes)
+        if random.random() < 0.5:
+            rendered = "x" * random.randint(0, 40)
+            cache.put(note, rendered)
+            model.pop(id(note), None)
+            model[id(note)] = rendered
+            while sum(map(len, model.values())) > cache.max_size:
+                model.popitem(last=False)
+        else:
+            assert cache.get(note) == model.get(id(note))
+            if id(note) in model:
+                model.move_to_end(id(note))
+
+        assert len(cache) == len(model)
+        assert cache.size == sum(map(len, model.values()))
+
+
+def test_strings_of_freed_records_are_dropped(cache):
+    notes = [Note(f"Title {i}", "Milk", []) for i in range(10)]
+    rendered = [str(note) for note in notes]
+    assert len(cache) == 10
+
+    del notes[5:]
+    gc.collect()
+    assert len(cache) == 5
+    assert cache.size == sum(map(len, rendered[:5]))
+
+
+def test_records_merged_from_other_instances_are_rendered_again(load, data_filename):
+    first = load()
+    contact = Contact("Ann")
+    contact.set_phone("0123456789")
+    first.contact_book.add(contact)
+    first.note_book.add_record(Note("Shopping", "Milk", []))
+    first.save(data_filename)
+
+    second = load()
+    second.contact_book.find("Ann").set_phone("0987654321")
+    second.note_book.change("Shopping", None, "Bread", None)
+    second.save(data_filename)
+
+    assert_rendered_as_uncached(
+        [*first.contact_book.values(), *first.note_book.values()]
+    )
+    first.save(data_filename)
+    assert "0987654321" in str(first.contact_book.find("Ann"))
+    assert "Bread" in str(first.note_book.find_by_title("Shopping"))
+    assert_rendered_as_uncached(
+        [*second.contact_book.values(), *second.note_book.values()]
+    )
+    first.close()
+    second.close()
@@ -0,0 +1,187 @@
+import asyncio
+import socket
+
+import pytest
+
+from neoassistant.assistant import Neoassistant
+from neoassistant.batch import run_script
+from neoassistant.client import run_client
+from neoassistant.instrumentation import instrumentation
+from neoassistant.server import parse_address, serve
+
+
+ADDRESS = "unix:server.sock"
+
+SOCKET_PATH = parse_address(ADDRESS)[1][0]
+
+# Commands of every kind: changing the books, listing them and failing
+SCRIPT = [
+    "add -n Ann -p 0123456789 -b 29.02.2000 -e ann@example.com",
+    "add -n Bob -a 'Kyiv, Franka 1'",
+    "add -n Ann",
+    "change -cn Ann -p 0987654321",
+    "change -cn Anne -n Carol",
+    "find-by-phone -p 0987654321",
+    "filter -cr Kyiv",
+    "filter -cr nothing",
+    "all --limit 1 --offset 1",
+    "add-note -t Shopping -c 'Milk [and] bread' --tags home",
+    "add-note -t Work -c Report --tags work home",
+    "filter-notes-by-tags --tags home --all",
+    "tags",
+    "change-note -ct Shopping -t Food",
+    "delete-note -t Work",
+    "all-notes",
+    "show -n Bob",
+    "add -n 'Dave",
+    "add -n Eve -p 123",
+    "delete -n Bob",
+    "all",
+]
+
+SCRIPT_FAILED_COUNT = 4
+
+
+@pytest.fixture(name="run_server")
+def fixture_run_server(load, data_filename):
+    """Return a function serving the books while the clients execute their lines.
+
+    The clients are run one after another or concurrently, the function
+    returns their numbers of failed commands.
+    """
+
+    def run_server(
+        *clients: list[str], concurrently: bool = False, continue_on_error: bool = True
+    ) -> list[int]:
+        assistant = load()
+
+        async def run():
+            server = asyncio.create_task(serve(assistant, data_filename, ADDRESS))
+            while not server.done():
+                try:
+                    _, writer = await asyncio.open_unix_connection(SOCKET_PATH)
+                    writer.close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.01)
+
+            try:
+                calls = [
+                    asyncio.to_thread(
+                        run_client, ADDRESS, lines, "plain", continue_on_error
+                    )
+                    for lines in clients
+                ]
+                if concurrently:
+                    return await asyncio.gather(*calls)
+                return [await call for call in calls]
+            finally:
+                server.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await server
+
+        try:
+            return asyncio.run(run())
+        finally:
+            assistant.close()
+
+    return run_server
+
+
+@pytest.fixture(name="stats")
+def fixture_stats(monkeypatch) -> dict:
+    monkeypatch.setattr(instrumentation, "stats", {})
+    monkeypatch.setattr(instrumentation, "calls", {})
+    return instrumentation.stats
+
+
+def get_books(data_filename: str) -> tuple[str, str]:
+    assistant = Neoassistant()
+    assistant.load(data_filename)
+    books = str(assistant.contact_book), str(assistant.note_book)
+    assistant.close()
+    return books
+
+
+def test_script_output_matches_the_script_mode(run_server, data_filename, capsys):
+    assert run_server(SCRIPT) == [SCRIPT_FAILED_COUNT]
+    server_output = capsys.readouterr()
+
+    # the same script executed right on the books of another data file
+    assistant = Neoassistant()
+    assistant.load("script.bin")
+    failed_count = run_script(
+        assistant, "script.bin", SCRIPT, output="plain", continue_on_error=True
+    )
+    assistant.close()
+
+    assert failed_count == SCRIPT_FAILED_COUNT
+    assert capsys.readouterr() == server_output
+    assert get_books("script.bin") == get_books(data_filename)
+
+
+def test_script_stops_at_the_first_failure(run_server, get_names, capsys):
+    lines = ["add -n Ann", "add -n Ann", "add -n Bob"]
+
+    assert run_server(lines, continue_on_error=False) == [1]
+    assert "Line 2: Contact with name 'Ann' already exists." in capsys.readouterr().err
+    assert get_names() == ["Ann"]
+
+
+def test_concurrent_clients_are_all_saved(run_server, get_names):
+    clients = [[f"add -n Client{i}-{j}" for j in range(30)] for i in range(8)]
+
+    assert run_server(*clients, concurrently=True) == [0] * 8
+    assert get_names() == sorted(
+        line.split()[-1] for lines in clients for line in lines
+    )
+
+
+def test_exit_closes_only_its_own_connection(run_server, get_names):
+    assert run_server(["add -n Ann", "exit", "add -n Bob"], ["add -n Carol"]) == [0, 0]
+    assert get_names() == ["Ann", "Carol"]
+
+
+def test_unknown_commands_and_lines_fail(run_server, capsys):
+    assert run_server(["ad -n Ann", "add -n 'Ann", "tags --all"]) == [3]
+    errors = capsys.readouterr().err.splitlines()
+    assert [error for error in errors if error.startswith("Line ")] == [
+        "Line 1: Unknown command. Did you mean: add, all, tags?",
+        "Line 2: No closing quotation",
+        "Line 3: The command 'tags' is invalid.",
+    ]
+
+
+def test_missing_server_fails(capsys):
+    assert run_client(ADDRESS, ["add -n Ann"]) == 1
+    assert capsys.readouterr().err.startswith(
+        f"Cannot connect to the server at {ADDRESS}: "
+    )
+
+
+def test_lost_connection_fails(capsys):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(SOCKET_PATH)
+        listener.listen()
+
+        # a server accepting the connection and closing it without a response
+        def close_connection():
+            connection, _ = listener.accept()
+            connection.close()
+
+        async def run():
+            return await asyncio.gather(
+                asyncio.to_thread(close_connection),
+                asyncio.to_thread(run_client, ADDRESS, ["add -n Ann"], "plain"),
+            )
+
+        assert asyncio.run(run())[1] == 1
+    assert capsys.readouterr().err.startswith("The connection to the server was lost")
+
+
+def test_commands_are_measured(run_server, stats):
+    run_server(["add -n Ann", "add-note -t Shopping --tags home", "tags", "exit"])
+
+    assert set(stats["add"]) == {"parse", "execute", "render", "save"}
+    assert set(stats["tags"]) == {"parse", "execute", "render"}
+    assert set(stats["exit"]) == {"parse", "execute", "render"}
@@ -0,0 +1,159 @@
+import os
+from contextlib import suppress
+
+import pytest
+
+from neoassistant.assistant import Neoassistant, get_data_path
+from neoassistant.contact_book import Contact
+from neoassistant.note_book import Note
+from neoassistant.snapshot import HEADER, MAGIC, MIN_COMPRESSED_LENGTH
+
+
+COMPRESSIONS = [None, "zlib", "lzma"]
+
+# Long enough to be compressed, short enough to be stored as it is
+LONG_CONTENT = "Milk, bread and butter. " * 20
+SHORT_CONTENT = "Milk"
+
+
+def create_books(assistant: Neoassistant):
+    contact = Contact("Ann")
+    contact.set_phone("0123456789")
+    assistant.contact_book.add(contact)
+    assistant.note_book.add_record(Note("Long", LONG_CONTENT, ["home"]))
+    assistant.note_book.add_record(Note("Short", SHORT_CONTENT, []))
+
+
+def get_contents(assistant: Neoassistant) -> dict[str, str]:
+    return {note.title: note.content for note in assistant.note_book.values()}
+
+
+def test_contents_are_sized_for_the_tests():
+    assert len(SHORT_CONTENT) < MIN_COMPRESSED_LENGTH <= len(LONG_CONTENT)
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_compacted_books_are_reloaded(compression, load, data_filename):
+    assistant = Neoassistant(compression)
+    create_books(assistant)
+    assistant.compact(data_filename)
+
+    # the notes now read their contents from the snapshot
+    assert get_contents(assistant) == {"Long": LONG_CONTENT, "Short": SHORT_CONTENT}
+    assistant.close()
+
+    path = get_data_path(data_filename)
+    with open(path, "rb") as file:
+        assert file.read(HEADER.size)[: len(MAGIC)] == MAGIC
+    assert not get_data_path(f"{data_filename}.journal").exists()
+
+    assistant = load()
+    assert get_contents(assistant) == {"Long": LONG_CONTENT, "Short": SHORT_CONTENT}
+    assert all(note.stored_content for note in assistant.note_book.values())
+    assert assistant.note_book.search("butter")[0].title == "Long"
+    assert assistant.note_book.search_by_tags(["home"])[0].title == "Long"
+    assert assistant.contact_book.find_by_phone("0123456789")[0].name.value == "Ann"
+    assistant.close()
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_compression_makes_long_contents_smaller(compression, load, data_filename):
+    assistant = Neoassistant(compression)
+    create_books(assistant)
+    assistant.compact(data_filename)
+    assistant.close()
+
+    assistant = load()
+    notes = {note.title: note.stored_content for note in assistant.note_book.values()}
+    assert notes["Short"].compression is None
+    assert notes["Short"].length == len(SHORT_CONTENT)
+    assert notes["Long"].compression == compression
+    if compression:
+        assert notes["Long"].length < len(LONG_CONTENT)
+    assistant.close()
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("next_compression", COMPRESSIONS)
+def test_snapshot_is_compacted_again(
+    compression, next_compression, load, data_filename
+):
+    assistant = Neoassistant(compression)
+    create_books(assistant)
+    assistant.compact(data_filename)
+    assistant.close()
+
+    # the contents mapped from the snapshot are written into the one replacing it
+    assistant = load(next_compression)
+    assistant.note_book.change("Short", None, "Bread", None)
+    assistant.note_book.add_record(Note("New", LONG_CONTENT.upper(), []))
+    assistant.note_book.delete("Long")
+    assistant.save(data_filename)
+    assistant.compact(data_filename)
+    assert get_contents(assistant) == {"New": LONG_CONTENT.upper(), "Short": "Bread"}
+    assistant.close()
+
+    assistant = load()
+    assert get_contents(assistant) == {"New": LONG_CONTENT.upper(), "Short": "Bread"}
+    assistant.close()
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_journal_is_replayed_over_the_snapshot(compression, load, data_filename):
+    assistant = Neoassistant(compression)
+    create_books(assistant)
+    assistant.compact(data_filename)
+    assistant.note_book.change("Long", "Longer", None, None)
+    assistant.contact_book.delete("Ann")
+    assistant.save(data_filename)
+    assistant.close()
+
+    assistant = load()
+    assert get_contents(assistant) == {"Longer": LONG_CONTENT, "Short": SHORT_CONTENT}
+    assert len(assistant.contact_book) == 0
+    assistant.close()
+
+
+def get_open_paths() -> set[str]:
+    """Return paths of the files opened or mapped by this process"""
+    with open("/proc/self/maps", encoding="utf-8") as maps:
+        paths = {line.split(maxsplit=5)[-1].strip() for line in maps}
+    directory = "/proc/self/fd"
+    for fd in os.listdir(directory):
+        with suppress(OSError):
+            paths.add(os.readlink(os.path.join(directory, fd)))
+    return paths
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="needs procfs")
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_snapshot_is_closed_before_it_is_replaced(
+    compression, load, data_filename, monkeypatch
+):
+    assistant = Neoassistant(compression)
+    create_books(assistant)
+    assistant.compact(data_filename)
+    assistant.close()
+
+    assistant = load(compression)
+    assert assistant.note_book.search("butter")[0].title == "Long"
+
+    # Windows cannot replace a file which is open or mapped
+    path = str(get_data_path(data_filename))
+    replace = os.replace
+
+    def checked_replace(source, target):
+        assert path not in get_open_paths()
+        replace(source, target)
+
+    monkeypatch.setattr(os, "replace", checked_replace)
+    assistant.note_book.add_record(Note("New", SHORT_CONTENT, []))
+    assistant.compact(data_filename)
+
+    assert get_contents(assistant) == {
+        "Long": LONG_CONTENT,
+        "New": SHORT_CONTENT,
+        "Short": SHORT_CONTENT,
+    }
+    assert path in get_open_paths()
+    assistant.close()